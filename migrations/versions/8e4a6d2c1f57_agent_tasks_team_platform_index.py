@@ -0,0 +1,41 @@
+"""Index agent tasks by team, platform and creation time
+
+Revision ID: 8e4a6d2c1f57
+Revises: 3b1f9c2d7a41
+Create Date: 2026-10-16 14:03:27.540913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4a6d2c1f57'
+down_revision: Union[str, None] = '3b1f9c2d7a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so writes to agent_tasks aren't blocked
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_team_platform_created',
+            'agent_tasks',
+            ['team_id', 'platform_name', 'created_at'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_tasks_team_platform_created',
+            table_name='agent_tasks',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,33 @@
+"""Store file_storage.file_data uncompressed
+
+Revision ID: f3a8d61c2b45
+Revises: e2b7c5a94f10
+Create Date: 2026-10-16 19:20:44.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a8d61c2b45'
+down_revision: Union[str, None] = 'e2b7c5a94f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Out-of-line but uncompressed, so substring() slices fetch only the TOAST
+    # chunks they need instead of decompressing from the start of the value.
+    op.execute("ALTER TABLE file_storage ALTER COLUMN file_data SET STORAGE EXTERNAL")
+    # The storage setting only applies to values written from now on, so
+    # rewrite the existing rows to store them uncompressed as well
+    op.execute("UPDATE file_storage SET file_data = file_data || ''::bytea")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE file_storage ALTER COLUMN file_data SET STORAGE EXTENDED")
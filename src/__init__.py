@@ -0,0 +1,8 @@
+import os
+import dotenv
+
+
+# Loaded once here for every entry point (api, slack bot, celery, alembic)
+# instead of in each module. DOTENV_PATH can point at other files.
+for env_file in os.getenv("DOTENV_PATH", os.pathsep.join(["src/.env.api", "src/.env"])).split(os.pathsep):
+    dotenv.load_dotenv(env_file, override=False)
@@ -1,19 +1,19 @@
 import os
-import logging, dotenv
+import logging
+import threading
+from typing import Optional
 import redis
-from fastapi.responses import StreamingResponse
-from io import BytesIO
-
-dotenv.load_dotenv("src/.env.api")
+from cachetools import TTLCache
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 
 from .database.data_store import FileStorage
-from .database.engine import get_db
+from .database.engine import SessionLocal
 from .database.oauth_tokens import OAuthTokens
 from .database.slack_tokens import SlackToken
 from .database.users import User
 from .globals import OAUTH_INTEGRATIONS
-from sqlalchemy.orm import Session
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Header
 from fastapi.responses import JSONResponse
 from fastapi import HTTPException
 
@@ -25,43 +25,75 @@ logger = logging.getLogger(__name__)
 
 
 app = FastAPI()
+slack_client = OAUTH_INTEGRATIONS["slack"]
+google_client = OAUTH_INTEGRATIONS["google"]
+redis_client = redis.Redis.from_url(
+    f"{os.getenv('REDIS_URL')}/3", max_connections=64, socket_keepalive=True
+)
+
+# Decoded OAuth states, so retried callbacks skip JWT verification and decryption
+state_cache: TTLCache = TTLCache(maxsize=4096, ttl=5)
+state_cache_lock = threading.Lock()
+IMAGE_MIME_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".bmp": "image/bmp",
+    ".webp": "image/webp",
+    ".svg": "image/svg+xml",
+}
+
+
+def decode_state_cached(state: str) -> dict:
+    with state_cache_lock:
+        decoded = state_cache.get(state)
+    if decoded is None:
+        decoded = google_client.decode_jwt_token(state)
+        with state_cache_lock:
+            state_cache[state] = decoded
+    return decoded
 
 
 @app.get("/slack/oauth_redirect")
-def slack_oauth_callback(code: str, session: Session = Depends(get_db)):
+async def slack_oauth_callback(code: str):
     logger.info("Received Slack OAuth callback request")
     if not code:
         logger.error("Missing 'code' parameter in callback")
         raise HTTPException(status_code=400, detail="Missing 'code' parameter in callback")
 
-    client = OAUTH_INTEGRATIONS["slack"]
-
-    token_response = client.exchange_code_for_token(code, validate=False)
+    token_response = await slack_client.exchange_code_for_token_async(code, validate=False)
     team_data = token_response.get('team', {})
-    SlackToken(
+    slack_token = SlackToken(
         team_id=team_data.get('id'),
         team_name=team_data.get('name'),
         bot_user_id=token_response.get('bot_user_id'),
         bot_access_token=token_response.get('access_token'),
         is_enterprise_install=token_response.get('is_enterprise_install', False)
-    ).save(session)
+    )
+
+    # Runs on a threadpool thread, so it opens its own session rather than
+    # sharing a scoped one across the await; committed and closed on exit
+    def save_slack_install() -> None:
+        with SessionLocal.session_factory.begin() as session:
+            slack_token.save(session, commit=False)
+
+    await run_in_threadpool(save_slack_install)
 
     logger.info(f"Successfully stored Slack token for team {team_data.get('name')}")
 
     return JSONResponse(content={"message": "Authorization successful"}, status_code=200)
 
 @app.get("/google/oauth_redirect")
-def google_oauth_callback(code: str, state: str, session: Session = Depends(get_db)):
+async def google_oauth_callback(code: str, state: str):
     logger.info("Received Google OAuth callback request")
     if not code or not state:
         logger.error("Missing required parameters in callback")
         raise HTTPException(status_code=400, detail="Missing 'code' or 'state' in callback")
 
-    google_client = OAUTH_INTEGRATIONS["google"]
-
     try:
         logger.info("Decoding state parameter")
-        decoded_state = google_client.decode_jwt_token(state)
+        decoded_state = decode_state_cached(state)
         if "team_id" not in decoded_state or "team_user_id" not in decoded_state:
             logger.error("Invalid state format")
             raise HTTPException(status_code=400, detail="Invalid state")
@@ -72,26 +104,14 @@ def google_oauth_callback(code: str, state: str, session: Session = Depends(get_
         logger.info(f"Processing OAuth for user_id: {team_user_id}, team_id: {team_id}")
         logger.info("Exchanging code for tokens")
 
-        tokens = google_client.exchange_code_for_token(code)
-        user = User.get_user(session, app_name, team_id, team_user_id)
-        if user:
-            User.update_associated_google_email(
-                session,
-                user.app_name,
-                user.app_team_id,
-                user.app_user_id,
-                tokens.get("email")
-            )
-        else:
-            User(
-                app_user_id=team_user_id,
-                app_team_id=team_id,
-                associated_google_email=tokens.get("email"),
-                app_name=app_name
-            ).upsert_user(session)
-        
-        logger.info("Saving tokens")
-        OAuthTokens(
+        tokens = await google_client.exchange_code_for_token_async(code)
+        user = User(
+            app_user_id=team_user_id,
+            app_team_id=team_id,
+            associated_google_email=tokens.get("email"),
+            app_name=app_name
+        )
+        oauth_tokens = OAuthTokens(
             user_id=team_user_id,
             team_id=team_id,
             integration_type="google",
@@ -99,7 +119,18 @@ def google_oauth_callback(code: str, state: str, session: Session = Depends(get_
             refresh_token=tokens["refresh_token"],
             expires_at=tokens["expires_at"],
             app_name=app_name
-        ).save(session)
+        )
+
+        # One transaction and a single flush for the user and its tokens on a
+        # private session, committed on exit and rolled back together on failure
+        def save_google_login() -> None:
+            with SessionLocal.session_factory.begin() as session:
+                user.upsert_user(session, commit=False)
+                logger.info("Saving tokens")
+                oauth_tokens.save(session, commit=False)
+            oauth_tokens.evict_cached()
+
+        await run_in_threadpool(save_google_login)
         logger.info("OAuth flow completed successfully")
         return JSONResponse(content={"message": "OAuth flow completed successfully"}, status_code=200)
     except Exception as e:
@@ -108,59 +139,51 @@ def google_oauth_callback(code: str, state: str, session: Session = Depends(get_
     
 
 @app.get("/file/{file_id}")
-def get_uploaded_file(file_id: str, session: Session = Depends(get_db)):
+def get_uploaded_file(file_id: str, if_none_match: Optional[str] = Header(None)):
     try:
-        # Connect to Redis
-        redis_client = redis.Redis.from_url(f"{os.getenv('REDIS_URL')}/3")
-
         # Check if the file ID is cached in Redis
         cached_file_id = redis_client.get(file_id)
         if not cached_file_id:
             logger.error(f"File not found in cache for ID: {file_id}")
             raise HTTPException(status_code=404, detail="File not found in cache")
 
-        # Retrieve the file details from the database
-        file = FileStorage.get_file_by_id(session, cached_file_id.decode("utf-8"))
-        if not file:
+        # Retrieve the file name and size only, the data itself is streamed below.
+        # A private session closed right away so it doesn't outlive the lookup.
+        stored_file_id = cached_file_id.decode("utf-8")
+        with SessionLocal.session_factory() as session:
+            file_info = FileStorage.get_file_info(session, stored_file_id)
+        if not file_info:
             logger.error(f"File not found in database for ID: {file_id}")
             raise HTTPException(status_code=404, detail="File not found")
 
-        # Ensure the file_data contains the actual file's content as bytes
-        file_bytes = file.file_data
-        if not file_bytes or not isinstance(file_bytes, bytes):
+        # Ensure the file actually has content
+        file_name, file_size, file_hash = file_info
+        if not file_size:
             logger.error(f"File data is missing or invalid for file ID: {file_id}")
             raise HTTPException(status_code=404, detail="File data is missing or invalid")
 
-        # Determine the correct MIME type
-        file_mime_type = "application/octet-stream"  # Default MIME type
-        if file.file_name.lower().endswith((".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp", ".svg")):
-            logger.info(f"File appears to be an image: {file.file_name}")
-            if file.file_name.lower().endswith(".png"):
-                file_mime_type = "image/png"
-            elif file.file_name.lower().endswith((".jpg", ".jpeg")):
-                file_mime_type = "image/jpeg"
-            elif file.file_name.lower().endswith(".gif"):
-                file_mime_type = "image/gif"
-            elif file.file_name.lower().endswith(".bmp"):
-                file_mime_type = "image/bmp"
-            elif file.file_name.lower().endswith(".webp"):
-                file_mime_type = "image/webp"
-            elif file.file_name.lower().endswith(".svg"):
-                file_mime_type = "image/svg+xml"
-
-            # For images, do not include the "attachment" disposition to allow browser view
-            content_disposition = f"inline; filename={file.file_name}"
-        else:
-            # For non-image files, force download
-            content_disposition = f"attachment; filename={file.file_name}"
-
-        # Return the file as a streaming response
-        file_stream = BytesIO(file_bytes)
-        logger.info(f"Successfully retrieved file: {file.file_name}")
+        # Stored files never change, so older rows without a hash can use their id
+        etag = f'"{file_hash or stored_file_id}"'
+        cache_headers = {"ETag": etag, "Cache-Control": "private, max-age=3600"}
+        if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers=cache_headers)
+
+        # Determine the correct MIME type, images are shown inline in the browser
+        extension = os.path.splitext(file_name)[1].lower()
+        file_mime_type = IMAGE_MIME_TYPES.get(extension, "application/octet-stream")
+        disposition = "inline" if extension in IMAGE_MIME_TYPES else "attachment"
+        content_disposition = f"{disposition}; filename={file_name}"
+
+        # Stream the file from the database in chunks
+        logger.info(f"Successfully retrieved file: {file_name}")
         return StreamingResponse(
-            file_stream,
+            FileStorage.stream_file(stored_file_id),
             media_type=file_mime_type,
-            headers={"Content-Disposition": content_disposition}
+            headers={
+                "Content-Disposition": content_disposition,
+                "Content-Length": str(file_size),
+                **cache_headers,
+            }
         )
     except HTTPException:
         raise  # Re-raise HTTP exceptions for proper status codes
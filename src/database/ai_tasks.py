@@ -2,12 +2,14 @@ from enum import Enum
 from datetime import datetime, timedelta
 from typing import Optional, List
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from sqlalchemy import (
     Column,
     DateTime,
     Enum as SAEnum,
+    Index,
     String,
+    lambda_stmt,
     select,
     update as sa_update,
     delete as sa_delete,
@@ -37,6 +39,10 @@ class AgentTaskORM(Base):
         DateTime, nullable=False, default=datetime.utcnow, index=True
     )
 
+    __table_args__ = (
+        Index("ix_tasks_team_platform_created", "team_id", "platform_name", "created_at"),
+    )
+
 
 class TaskStatus(str, Enum):
     IN_PROGRESS = "IN_PROGRESS"
@@ -66,26 +72,24 @@ class AgentTask(BaseModel):
         return AgentTask.model_validate(orm_obj)
 
     def to_orm_model(self) -> AgentTaskORM:
-        # Note: created_at will be set automatically by the ORM default
-        data = self.model_dump(exclude={"created_at"})
-        return AgentTaskORM(**data)
+        return AgentTaskORM(**self.model_dump())
 
     @staticmethod
     def create(session: Session, **data) -> "AgentTask":
         """
         Create & persist a new AgentTask.
-        created_at is set automatically.
+        created_at is set automatically. The validated model is returned
+        as-is, every column comes from it so there is nothing to refresh.
         """
         pyd = AgentTask(**data, created_at=datetime.utcnow())
-        orm_obj = pyd.to_orm_model()
-        session.add(orm_obj)
+        session.add(pyd.to_orm_model())
         session.commit()
-        session.refresh(orm_obj)
-        return AgentTask.from_orm_model(orm_obj)
+        return pyd
 
     @staticmethod
     def read(session: Session, task_id: str) -> Optional["AgentTask"]:
-        stmt = select(AgentTaskORM).where(AgentTaskORM.id == task_id)
+        # lambda_stmt caches the compiled SQL, task_id becomes a bound parameter
+        stmt = lambda_stmt(lambda: select(AgentTaskORM).where(AgentTaskORM.id == task_id))
         orm_obj = session.scalars(stmt).first()
         return AgentTask.from_orm_model(orm_obj) if orm_obj else None
 
@@ -99,13 +103,35 @@ class AgentTask(BaseModel):
             sa_update(AgentTaskORM)
             .where(AgentTaskORM.id == task_id)
             .values(**updates)
-            .execution_options(synchronize_session="fetch")
+            .returning(AgentTaskORM)
         )
-        result = session.execute(stmt)
-        if result.rowcount == 0:
+        orm_obj = session.execute(
+            stmt, execution_options={"synchronize_session": False}
+        ).scalar_one_or_none()
+        if orm_obj is None:
             return None
+        # Build the model before commit so expiry doesn't trigger a reload
+        task = AgentTask.from_orm_model(orm_obj)
         session.commit()
-        return AgentTask.read(session, task_id)
+        return task
+
+    @staticmethod
+    def finish(
+        session: Session,
+        task_id: str,
+        status: "TaskStatus",
+        note: str,
+    ) -> Optional["AgentTask"]:
+        """
+        Set the final status and append note to the description in a single
+        UPDATE, instead of reading the task first to rebuild its description.
+        """
+        return AgentTask.update(
+            session,
+            task_id,
+            status=status,
+            description=AgentTaskORM.description + note,
+        )
 
     @staticmethod
     def delete(session: Session, task_id: str) -> bool:
@@ -127,16 +153,19 @@ class AgentTask(BaseModel):
         """
         twenty_four_hrs_ago = datetime.utcnow() - timedelta(days=1)
 
-        stmt = (
-            select(AgentTaskORM)
-            .where(
+        stmt = lambda_stmt(
+            lambda: select(AgentTaskORM).where(
                 AgentTaskORM.team_id == team_id,
                 AgentTaskORM.platform_name == platform_name,
                 AgentTaskORM.created_at >= twenty_four_hrs_ago,
             )
         )
         if not include_complete:
-            stmt = stmt.where(AgentTaskORM.status != TaskStatusEnum.COMPLETE)
+            stmt += lambda s: s.where(AgentTaskORM.status != TaskStatusEnum.COMPLETE)
 
         orm_objs = session.scalars(stmt).all()
-        return [AgentTask.from_orm_model(o) for o in orm_objs]
+        return AGENT_TASK_LIST_ADAPTER.validate_python(orm_objs, from_attributes=True)
+
+
+# Built once so listing validates the whole result in a single call
+AGENT_TASK_LIST_ADAPTER = TypeAdapter(List[AgentTask])
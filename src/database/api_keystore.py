@@ -1,7 +1,8 @@
-import logging
+from functools import cached_property
 from typing import Optional
 from pydantic import BaseModel
-from sqlalchemy import Column, String, JSON, Index
+from sqlalchemy import Column, String, JSON, Index, delete as sa_delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from .engine import Base
 
@@ -15,14 +16,9 @@ class APIKey(BaseModel):
     integration_name: str
     metadata: dict[str, str] = {}
 
-    @property
+    @cached_property
     def doc_id(self) -> str:
-        key_components = [self.team_id, self.integration_name, self.app_name]
-        if self.user_id:
-            key_components.append(self.user_id)
-        doc_id = "_".join(key_components)
-        logging.info(f"Doc id: {doc_id}")
-        return doc_id
+        return "_".join(filter(None, [self.team_id, self.integration_name, self.app_name, self.user_id]))
 
     def to_model(self):
         return APIKeyModel(
@@ -46,26 +42,36 @@ class APIKey(BaseModel):
         )
 
     def save(self, session: Session) -> 'APIKeyModel':
-        api_key_model = self.to_model()
-        api_key_model.doc_id = self.doc_id
-        existing_key = session.query(APIKeyModel).filter_by(doc_id=self.doc_id).first()
-        if existing_key:
-            existing_key.team_id = self.team_id
-            existing_key.app_name = self.app_name
-            existing_key.user_id = self.user_id
-            existing_key.api_key = self.api_key
-            existing_key.integration_name = self.integration_name
-            existing_key.meta_data = self.metadata
-        else:
-            session.add(api_key_model)
+        stmt = pg_insert(APIKeyModel).values(
+            doc_id=self.doc_id,
+            team_id=self.team_id,
+            app_name=self.app_name,
+            user_id=self.user_id,
+            api_key=self.api_key,
+            integration_name=self.integration_name,
+            meta_data=self.metadata,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[APIKeyModel.doc_id],
+            set_={
+                "team_id": stmt.excluded.team_id,
+                "app_name": stmt.excluded.app_name,
+                "user_id": stmt.excluded.user_id,
+                "api_key": stmt.excluded.api_key,
+                "integration_name": stmt.excluded.integration_name,
+                "meta_data": stmt.excluded.meta_data,
+            },
+        )
+        session.execute(stmt)
         session.commit()
         return self
 
-    def delete(self, session: Session) -> None:
-        api_key_model = session.query(APIKeyModel).filter_by(doc_id=self.doc_id).first()
-        if api_key_model:
-            session.delete(api_key_model)
-            session.commit()
+    def delete(self, session: Session) -> bool:
+        result = session.execute(
+            sa_delete(APIKeyModel).where(APIKeyModel.doc_id == self.doc_id)
+        )
+        session.commit()
+        return result.rowcount > 0
 
     @staticmethod
     def read(
@@ -76,7 +82,7 @@ class APIKey(BaseModel):
         user_id: Optional[str] = None,
     ) -> Optional["APIKey"]:
         doc_id = "_".join(filter(None, [team_id, integration_name, app_name, user_id]))
-        api_key_model = session.query(APIKeyModel).filter_by(doc_id=doc_id).first()
+        api_key_model = session.get(APIKeyModel, doc_id)
         if api_key_model:
             return APIKey.from_model(api_key_model)
         return None
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, LargeBinary, String
-from sqlalchemy.orm import Session
-from typing import TypedDict, List
-from .engine import Base
+from sqlalchemy import Column, LargeBinary, String, func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, deferred, undefer
+from typing import Dict, Iterator, Optional, Set, Tuple, TypedDict, List
+from .engine import Base, engine
+import hashlib
 import secrets
 
 
+STREAM_CHUNK_SIZE = 1024 * 1024
+
 
 class FileUploadData(TypedDict):
     file_bytes: bytes
@@ -12,63 +16,124 @@ class FileUploadData(TypedDict):
 
 
 class FileStorage(Base):
+    # Sessions passed in here are owned by the caller (get_db closes them),
+    # so these helpers never close them themselves.
     __tablename__ = 'file_storage'
     id = Column(String, primary_key=True, unique=True, nullable=False)
     file_name = Column(String, nullable=False)
-    file_data = Column(LargeBinary, nullable=False)
+    # Only loaded when asked for, metadata queries never pull the blob
+    file_data = deferred(Column(LargeBinary, nullable=False))
+    content_hash = Column(String(32), index=True, unique=True)
 
     @staticmethod
     def get_file_by_id(session: Session, file_id: str) -> 'FileStorage':
-        try:
-            file = session.query(FileStorage).filter_by(id=file_id).first()
-            if not file:
-                raise ValueError("File not found")
-            return file
-        except Exception as e:
-            raise e
-        finally:
-            session.close()
+        file = (
+            session.query(FileStorage)
+            .options(undefer(FileStorage.file_data))
+            .filter_by(id=file_id)
+            .first()
+        )
+        if not file:
+            raise ValueError("File not found")
+        return file
+
+    @staticmethod
+    def get_file_info(session: Session, file_id: str) -> Optional[Tuple[str, int, Optional[str]]]:
+        """Return (file_name, size in bytes, content_hash) without loading the file data."""
+        row = session.execute(
+            select(
+                FileStorage.file_name,
+                func.octet_length(FileStorage.file_data),
+                FileStorage.content_hash,
+            )
+            .where(FileStorage.id == file_id)
+        ).first()
+        return (row[0], row[1] or 0, row[2]) if row else None
+
+    @staticmethod
+    def stream_file(file_id: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Yield the file data in chunk_size slices, so the whole blob is never
+        held in memory. All slices come from one query on one connection,
+        read through a server-side cursor a few chunks at a time. file_data
+        is stored uncompressed (STORAGE EXTERNAL), so each slice only reads
+        its own TOAST chunks.
+        """
+        stmt = text(
+            "SELECT substring(file_data FROM chunk_offset FOR :chunk_size) "
+            "FROM file_storage, "
+            "generate_series(1, octet_length(file_data), :chunk_size) AS chunk_offset "
+            "WHERE id = :file_id ORDER BY chunk_offset"
+        )
+        with engine.connect() as connection:
+            result = connection.execution_options(stream_results=True, yield_per=4).execute(
+                stmt, {"file_id": file_id, "chunk_size": chunk_size}
+            )
+            for (chunk,) in result:
+                yield bytes(chunk)
 
     def upload_file_from_blob(session: Session, file_bytes: bytes, file_name: str) -> str:
-        try:
-            if len(file_bytes) > 1 * 1024 * 1024 * 1024:
-                raise ValueError("File size exceeds 1GB limit")
-            
-            generated_id = secrets.token_urlsafe(32)
-            new_file = FileStorage(id=generated_id, file_name=file_name, file_data=file_bytes)
-            session.add(new_file)
-            session.commit()
-            return new_file.id
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
+        return FileStorage.batch_upload_files(
+            session, [{"file_bytes": file_bytes, "file_name": file_name}]
+        )[0]
 
     @staticmethod
     def batch_upload_files(session: Session, files: List[FileUploadData]) -> List[str]:
+        """
+        Store the files and return their ids in input order. Files whose
+        content is already stored reuse the existing row instead of
+        writing the blob again.
+        """
         try:
             if not files:
                 return []
             
-            uploaded_ids = []
             for file in files:
                 if len(file["file_bytes"]) > 1 * 1024 * 1024 * 1024:
                     raise ValueError(f"File size exceeds 1GB limit for file {file['file_name']}")
 
-                generated_id = secrets.token_urlsafe(35)
-                new_file = FileStorage(
-                    id=generated_id,
-                    file_name=file["file_name"],
-                    file_data=file["file_bytes"]
-                )
-                session.add(new_file)
-                uploaded_ids.append(generated_id)
+            hashes = [hash_file_bytes(file["file_bytes"]) for file in files]
+            ids_by_hash = FileStorage._ids_for_hashes(session, set(hashes))
+
+            rows = {}
+            for file, file_hash in zip(files, hashes):
+                if file_hash not in ids_by_hash and file_hash not in rows:
+                    rows[file_hash] = {
+                        "id": secrets.token_urlsafe(35),
+                        "file_name": file["file_name"],
+                        "file_data": file["file_bytes"],
+                        "content_hash": file_hash,
+                    }
+
+            if rows:
+                # One multi-row INSERT instead of a unit-of-work flush per file
+                inserted = session.execute(
+                    pg_insert(FileStorage)
+                    .on_conflict_do_nothing(index_elements=["content_hash"])
+                    .returning(FileStorage.content_hash, FileStorage.id),
+                    list(rows.values()),
+                ).all()
+                ids_by_hash.update(dict(inserted))
+
+                # Rows skipped by the conflict were stored concurrently
+                missing = rows.keys() - ids_by_hash.keys()
+                if missing:
+                    ids_by_hash.update(FileStorage._ids_for_hashes(session, missing))
 
             session.commit()
-            return uploaded_ids
+            return [ids_by_hash[file_hash] for file_hash in hashes]
         except Exception as e:
             session.rollback()
             raise e
-        finally:
-            session.close()
+
+    @staticmethod
+    def _ids_for_hashes(session: Session, hashes: Set[str]) -> Dict[str, str]:
+        rows = session.execute(
+            select(FileStorage.content_hash, FileStorage.id)
+            .where(FileStorage.content_hash.in_(hashes))
+        ).all()
+        return dict(rows)
+
+
+def hash_file_bytes(file_bytes: bytes) -> str:
+    return hashlib.blake2b(file_bytes, digest_size=16).hexdigest()
@@ -2,11 +2,9 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, scoped_session, Session
 from sqlalchemy import create_engine
 from typing import Generator
-import os, dotenv
+import os
 
 
-dotenv.load_dotenv()
-
 # Database connection setup for PostgreSQL
 DATABASE_URL = os.getenv("DATABASE_URL")
 
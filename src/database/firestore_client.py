@@ -0,0 +1,28 @@
+import threading
+from functools import lru_cache
+
+import firebase_admin
+from firebase_admin import firestore
+
+
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def _init_once() -> None:
+    """Initialize the default Firebase app exactly once per process."""
+    global _initialized
+    with _init_lock:
+        if not _initialized:
+            try:
+                firebase_admin.get_app()
+            except ValueError:
+                firebase_admin.initialize_app()
+            _initialized = True
+
+
+@lru_cache(maxsize=1)
+def get_firestore_client() -> firestore.Client:
+    """Return the process-wide Firestore client, creating it on first use."""
+    _init_once()
+    return firestore.client()
@@ -1,13 +1,13 @@
-import firebase_admin
 from firebase_admin import firestore
 from datetime import datetime, timedelta
 from typing import Optional, List, Tuple, Dict, Any
+from .firestore_client import get_firestore_client
 
 
 
 class WatchRequestStorage:
     def __init__(self) -> None:
-        self.db: firestore.Client = firestore.client()
+        self.db: firestore.Client = get_firestore_client()
 
     def update_expiration(self, user_id: str, team_id: str, topic_name: str, expiration_millis: float) -> None:
         doc_ref: firestore.DocumentReference = self.db.collection('gmail_watch_expiration').document(f"{team_id}_{user_id}")
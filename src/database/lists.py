@@ -1,12 +1,19 @@
-import logging
-from typing import Optional, List as PyList, Tuple
+from functools import cached_property
+from typing import Iterator, Optional, List as PyList, Tuple
 from pydantic import BaseModel
-from sqlalchemy import Column, String, JSON, Boolean, Index, ARRAY
+from sqlalchemy import Column, String, JSON, Boolean, Index, ARRAY, func, or_, select, text, delete as sa_delete, update as sa_update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.mutable import MutableList
 from sqlalchemy.orm import Session
 from .engine import Base
 
 
 class List(BaseModel):
+    """
+    A named list of strings. The mutating methods write through: after a
+    successful call list_contents holds what was committed, so callers
+    don't need to read the list again.
+    """
     user_id: str
     team_id: str
     list_name: str
@@ -14,11 +21,9 @@ class List(BaseModel):
     is_private: bool
     metadata: Optional[dict] = {}
 
-    @property
+    @cached_property
     def doc_id(self) -> str:
-        doc_id = f"{self.team_id}_{self.list_name}_{self.user_id}"
-        logging.info(f"Generated doc_id: {doc_id}")
-        return doc_id
+        return f"{self.team_id}_{self.list_name}_{self.user_id}"
 
     def to_model(self) -> "ListModel":
         return ListModel(
@@ -33,7 +38,8 @@ class List(BaseModel):
 
     @staticmethod
     def from_model(model: "ListModel") -> "List":
-        return List(
+        # Rows come from our own table, so skip re-validating them
+        return List.model_construct(
             user_id=model.user_id,
             team_id=model.team_id,
             list_name=model.list_name,
@@ -43,68 +49,113 @@ class List(BaseModel):
         )
 
     def save(self, session: Session) -> "ListModel":
-        list_model = self.to_model()
-        existing_list = session.query(ListModel).filter_by(doc_id=self.doc_id).first()
-        if existing_list:
-            existing_list.user_id = self.user_id
-            existing_list.team_id = self.team_id
-            existing_list.list_name = self.list_name
-            existing_list.list_contents = self.list_contents
-            existing_list.is_private = self.is_private
-            existing_list.meta_data = self.metadata
-        else:
-            session.add(list_model)
+        session.execute(List._upsert_statement([self._row()]))
         session.commit()
-        return list_model
+        return self.to_model()
+
+    def _row(self) -> dict:
+        return {
+            "doc_id": self.doc_id,
+            "user_id": self.user_id,
+            "team_id": self.team_id,
+            "list_name": self.list_name,
+            "list_contents": self.list_contents,
+            "is_private": self.is_private,
+            "meta_data": self.metadata or {},
+        }
+
+    @staticmethod
+    def _upsert_statement(rows: PyList[dict]):
+        stmt = pg_insert(ListModel).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=[ListModel.doc_id],
+            set_={
+                "list_contents": stmt.excluded.list_contents,
+                "is_private": stmt.excluded.is_private,
+                "meta_data": stmt.excluded.meta_data,
+            },
+        )
 
     def delete(self, session: Session) -> bool:
-        list_model = session.query(ListModel).filter_by(doc_id=self.doc_id).first()
-        if list_model:
-            session.delete(list_model)
-            session.commit()
-            return True
-        return False
+        result = session.execute(
+            sa_delete(ListModel).where(
+                ListModel.doc_id == self.doc_id,
+                ListModel.user_id == self.user_id,
+            )
+        )
+        session.commit()
+        return result.rowcount > 0
             
     @staticmethod
     def read(session: Session, list_id: str, user_id: str, team_id: str) -> Optional["List"]:
-        if not list_id.startswith(f"{team_id}_"):
-            return None
-        list_model = session.query(ListModel).filter_by(doc_id=list_id).first()
-        if list_model and list_model.team_id == team_id:
-            if list_model.is_private and list_model.user_id != user_id:
-                return None
-            return List.from_model(list_model)
-        return None
+        # Ownership is checked in the WHERE clause, lists the user can't see are never loaded
+        list_model = session.scalars(
+            select(ListModel).where(
+                ListModel.doc_id == list_id,
+                ListModel.team_id == team_id,
+                or_(ListModel.user_id == user_id, ListModel.is_private == False),
+            )
+        ).first()
+        return List.from_model(list_model) if list_model else None
             
     @staticmethod
     def read_all(session: Session, user_id: str, team_id: str) -> PyList["List"]:
-        user_lists = session.query(ListModel).filter_by(team_id=team_id, user_id=user_id).all()
-        public_lists = session.query(ListModel).filter(
-            ListModel.team_id == team_id,
-            ListModel.is_private == False,
-            ListModel.user_id != user_id
-        ).all()
-        all_lists = user_lists + public_lists
-        return [List.from_model(list_model) for list_model in all_lists]
+        return list(List.iter_all(session, user_id, team_id))
+
+    @staticmethod
+    def iter_all(session: Session, user_id: str, team_id: str) -> Iterator["List"]:
+        """Lazily yield the same lists as read_all, fetching rows from the server in batches."""
+        # The user's own lists and the team's public ones in a single query, own lists first
+        stmt = (
+            select(ListModel)
+            .where(
+                ListModel.team_id == team_id,
+                or_(ListModel.user_id == user_id, ListModel.is_private == False),
+            )
+            .order_by(ListModel.user_id != user_id)
+            .execution_options(yield_per=200)
+        )
+        for list_model in session.scalars(stmt):
+            yield List.from_model(list_model)
 
     def add_item(self, session: Session, item: str) -> bool:
-        list_model = session.query(ListModel).filter_by(doc_id=self.doc_id).first()
-        if list_model and list_model.user_id == self.user_id:
-            if item not in list_model.list_contents:
-                list_model.list_contents.append(item)
-                session.commit()
-                return True
-        return False
+        # Appended server-side in one statement, no read and no lost update
+        result = session.execute(
+            sa_update(ListModel)
+            .where(
+                ListModel.doc_id == self.doc_id,
+                ListModel.user_id == self.user_id,
+                ~ListModel.list_contents.any(item),
+            )
+            .values(list_contents=func.array_append(ListModel.list_contents, item))
+            .returning(ListModel.list_contents)
+            .execution_options(synchronize_session=False)
+        )
+        contents = result.scalar_one_or_none()
+        session.commit()
+        if contents is None:
+            return False
+        self.list_contents = list(contents)
+        return True
 
     def remove_item(self, session: Session, index: int) -> Tuple[bool, Optional[str]]:
-        list_model = session.query(ListModel).filter_by(doc_id=self.doc_id).first()
+        # Lock the row so concurrent pops can't overwrite each other
+        list_model = (
+            session.query(ListModel)
+            .filter_by(doc_id=self.doc_id)
+            .with_for_update()
+            .first()
+        )
         if list_model and list_model.user_id == self.user_id:
             try:
                 item = list_model.list_contents.pop(index)
-                session.commit()
-                return True, item
             except IndexError:
+                session.rollback()
                 return False, None
+            self.list_contents = list(list_model.list_contents)
+            session.commit()
+            return True, item
+        session.rollback()
         return False, None
 
 
@@ -115,10 +166,12 @@ class ListModel(Base):
     user_id = Column(String, nullable=False)
     team_id = Column(String, nullable=False)
     list_name = Column(String, nullable=False)
-    list_contents = Column(ARRAY(String), default=list)
+    # MutableList so in-place changes to the array are flushed
+    list_contents = Column(MutableList.as_mutable(ARRAY(String)), default=list)
     is_private = Column(Boolean, nullable=False, default=True)
     meta_data = Column(JSON, default=dict)
 
     __table_args__ = (
         Index("ix_team_user_listname", "team_id", "user_id", "list_name", unique=True),
+        Index("ix_public_team_user", "team_id", "user_id", postgresql_where=text("is_private = false")),
     )
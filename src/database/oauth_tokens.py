@@ -1,10 +1,27 @@
-from typing import Optional
+import threading
+from functools import cached_property, lru_cache
+from typing import List, Optional
+from cachetools import TTLCache
 from sqlalchemy import Column, String, Float, Index
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from .engine import Base
 
 
+# Short-lived per-process cache of token reads keyed by doc_id. Committed
+# writes and deletes through this module evict it; the few-second TTL bounds
+# staleness across processes.
+tokens_cache: TTLCache = TTLCache(maxsize=10_000, ttl=5)
+tokens_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=4096)
+def make_doc_id(team_id: str, integration_type: str, app_name: str, user_id: Optional[str] = None) -> str:
+    """Build the token row key, the same handful of keys are looked up over and over."""
+    return "_".join(filter(None, [team_id, integration_type, app_name, user_id]))
+
+
 class OAuthTokens(BaseModel):
     user_id: Optional[str] = None
     team_id: str
@@ -14,12 +31,9 @@ class OAuthTokens(BaseModel):
     refresh_token: str
     expires_at: float
 
-    @property
+    @cached_property
     def doc_id(self) -> str:
-        key_components = [self.team_id, self.integration_type, self.app_name]
-        if self.user_id:
-            key_components.append(self.user_id)
-        return "_".join(key_components)
+        return make_doc_id(self.team_id, self.integration_type, self.app_name, self.user_id)
 
     def to_model(self):
         return OAuthTokensModel(
@@ -35,7 +49,8 @@ class OAuthTokens(BaseModel):
 
     @staticmethod
     def from_model(model: "OAuthTokensModel") -> "OAuthTokens":
-        return OAuthTokens(
+        # Rows come from our own table, so skip re-validating them
+        return OAuthTokens.model_construct(
             user_id=model.user_id,
             team_id=model.team_id,
             app_name=model.app_name,
@@ -45,36 +60,57 @@ class OAuthTokens(BaseModel):
             expires_at=model.expires_at,
         )
 
-    def save(self, session: Session) -> "OAuthTokens":
-        token_model = self.to_model()
-        existing_token = session.query(OAuthTokensModel).filter_by(doc_id=self.doc_id).first()
-        if existing_token:
-            existing_token.user_id = self.user_id
-            existing_token.team_id = self.team_id
-            existing_token.app_name = self.app_name
-            existing_token.integration_type = self.integration_type
-            existing_token.access_token = self.access_token
-            existing_token.refresh_token = self.refresh_token
-            existing_token.expires_at = self.expires_at
-        else:
-            session.add(token_model)
-        session.commit()
+    def save(self, session: Session, commit: bool = True) -> "OAuthTokens":
+        session.execute(
+            OAuthTokens._upsert_statement([{"doc_id": self.doc_id, **self.model_dump()}])
+        )
+        # Evicting before the commit lands would let a read re-cache the old
+        # tokens, so callers passing commit=False call evict_cached() after theirs
+        if commit:
+            session.commit()
+            self.evict_cached()
         return self
 
+    def evict_cached(self) -> None:
+        with tokens_cache_lock:
+            tokens_cache.pop(self.doc_id, None)
+
+    @staticmethod
+    def _upsert_statement(rows: List[dict]):
+        # The other columns make up doc_id, so only the token fields can change
+        stmt = pg_insert(OAuthTokensModel).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=[OAuthTokensModel.doc_id],
+            set_={
+                "access_token": stmt.excluded.access_token,
+                "refresh_token": stmt.excluded.refresh_token,
+                "expires_at": stmt.excluded.expires_at,
+            },
+        )
+
     @staticmethod
     def delete(session: Session, team_id: str, app_name: str, integration_type: str, user_id: Optional[str] = None) -> None:
-        doc_id = "_".join(filter(None, [team_id, integration_type, app_name, user_id]))
-        token_model = session.query(OAuthTokensModel).filter_by(doc_id=doc_id).first()
+        doc_id = make_doc_id(team_id, integration_type, app_name, user_id)
+        token_model = session.get(OAuthTokensModel, doc_id)
         if token_model:
             session.delete(token_model)
             session.commit()
+        with tokens_cache_lock:
+            tokens_cache.pop(doc_id, None)
 
     @staticmethod
     def read(session: Session, team_id: str, app_name: str, integration_type: str, user_id: Optional[str] = None) -> Optional["OAuthTokens"]:
-        doc_id = "_".join(filter(None, [team_id, integration_type, app_name, user_id]))
-        token_model = session.query(OAuthTokensModel).filter_by(doc_id=doc_id).first()
+        doc_id = make_doc_id(team_id, integration_type, app_name, user_id)
+        with tokens_cache_lock:
+            cached = tokens_cache.get(doc_id)
+        if cached is not None:
+            return cached.model_copy()
+        token_model = session.get(OAuthTokensModel, doc_id)
         if token_model:
-            return OAuthTokens.from_model(token_model)
+            tokens = OAuthTokens.from_model(token_model)
+            with tokens_cache_lock:
+                tokens_cache[doc_id] = tokens.model_copy()
+            return tokens
         return None
 
 
@@ -1,10 +1,13 @@
+from dataclasses import asdict, dataclass
 from sqlalchemy import Column, String, JSON, Index
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from .engine import Base
 
-class SlackToken(BaseModel):
+
+@dataclass(slots=True)
+class SlackToken:
     team_id: str
     team_name: str
     bot_user_id: str
@@ -34,28 +37,34 @@ class SlackToken(BaseModel):
             is_enterprise_install=model.is_enterprise_install,
         )
 
-    def save(self, session: Session) -> "SlackTokenModel":
-        slack_token_model = self.to_model()
-        existing_entry = session.query(SlackTokenModel).filter_by(team_id=self.doc_id).first()
-        if existing_entry:
-            existing_entry.team_name = self.team_name
-            existing_entry.bot_user_id = self.bot_user_id
-            existing_entry.bot_access_token = self.bot_access_token
-            existing_entry.is_enterprise_install = self.is_enterprise_install
-        else:
-            session.add(slack_token_model)
-        session.commit()
+    def save(self, session: Session, commit: bool = True) -> "SlackTokenModel":
+        session.execute(SlackToken._upsert_statement([asdict(self)]))
+        if commit:
+            session.commit()
         return self
 
+    @staticmethod
+    def _upsert_statement(rows: List[dict]):
+        stmt = pg_insert(SlackTokenModel).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=[SlackTokenModel.team_id],
+            set_={
+                "team_name": stmt.excluded.team_name,
+                "bot_user_id": stmt.excluded.bot_user_id,
+                "bot_access_token": stmt.excluded.bot_access_token,
+                "is_enterprise_install": stmt.excluded.is_enterprise_install,
+            },
+        )
+
     def delete(self, session: Session) -> None:
-        existing_entry = session.query(SlackTokenModel).filter_by(team_id=self.doc_id).first()
+        existing_entry = session.get(SlackTokenModel, self.doc_id)
         if existing_entry:
             session.delete(existing_entry)
             session.commit()
 
     @staticmethod
     def read(session: Session, team_id: str) -> Optional["SlackToken"]:
-        model_instance = session.query(SlackTokenModel).filter_by(team_id=team_id).first()
+        model_instance = session.get(SlackTokenModel, team_id)
         if model_instance:
             return SlackToken.from_model(model_instance)
         return None
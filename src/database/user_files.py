@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from typing import List, Optional
-from sqlalchemy import ARRAY, Column, String, Index
+from typing import Iterator, List, Optional
+from sqlalchemy import ARRAY, Column, String, Index, lambda_stmt, select, delete as sa_delete
 from sqlalchemy.orm import Session
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
@@ -37,9 +37,14 @@ class UserFile(BaseModel):
 
     @staticmethod
     def read(name: str, team_id: str, platform_name: str, session: Session):
-        orm_instance = session.query(UserFileORM).filter_by(
-            name=name, team_id=team_id, platform_name=platform_name
-        ).first()
+        stmt = lambda_stmt(
+            lambda: select(UserFileORM).where(
+                UserFileORM.name == name,
+                UserFileORM.team_id == team_id,
+                UserFileORM.platform_name == platform_name,
+            )
+        )
+        orm_instance = session.scalars(stmt).first()
         if orm_instance:
             return UserFile.from_orm_model(orm_instance)
         return None
@@ -57,19 +62,53 @@ class UserFile(BaseModel):
 
     @staticmethod
     def delete(file_id: uuid.UUID, session: Session):
-        orm_instance = session.query(UserFileORM).filter_by(id=file_id).first()
-        if orm_instance:
-            session.delete(orm_instance)
-            session.commit()
-            return True
-        return False
+        result = session.execute(sa_delete(UserFileORM).where(UserFileORM.id == file_id))
+        session.commit()
+        return result.rowcount > 0
+
+    @staticmethod
+    def delete_by_name(name: str, team_id: str, platform_name: str, session: Session) -> Optional[List[str]]:
+        """
+        Delete a file by name in one statement and return the vector ids it
+        held, or None if there was no such file.
+        """
+        row = session.execute(
+            sa_delete(UserFileORM)
+            .where(
+                UserFileORM.name == name,
+                UserFileORM.team_id == team_id,
+                UserFileORM.platform_name == platform_name,
+            )
+            .returning(UserFileORM.vector_ids)
+        ).first()
+        session.commit()
+        if row is None:
+            return None
+        return row.vector_ids or []
 
     @staticmethod
     def get_files_by_team_and_platform(team_id: str, platform_name: str, session: Session):
-        orm_instances = session.query(UserFileORM).filter_by(
-            team_id=team_id, platform_name=platform_name
-        ).all()
-        return [UserFile.from_orm_model(instance) for instance in orm_instances]
+        return list(UserFile.iter_files_by_team_and_platform(team_id, platform_name, session))
+
+    @staticmethod
+    def iter_files_by_team_and_platform(team_id: str, platform_name: str, session: Session) -> Iterator["UserFile"]:
+        # Plain column rows streamed in batches, no ORM objects are built.
+        # lambda_stmt caches the compiled SQL, the ids become bound parameters
+        stmt = lambda_stmt(
+            lambda: select(UserFileORM.id, UserFileORM.name, UserFileORM.vector_ids)
+            .where(
+                UserFileORM.team_id == team_id,
+                UserFileORM.platform_name == platform_name,
+            )
+        )
+        for row in session.execute(stmt, execution_options={"yield_per": 500}):
+            yield UserFile.model_construct(
+                id=row.id,
+                name=row.name,
+                vector_ids=row.vector_ids or [],
+                team_id=team_id,
+                platform_name=platform_name,
+            )
 
     def to_orm_model(self):
         return UserFileORM(
@@ -82,7 +121,8 @@ class UserFile(BaseModel):
 
     @classmethod
     def from_orm_model(cls, orm_model: UserFileORM):
-        return cls(
+        # Rows were validated on the way in, skip re-validating them
+        return cls.model_construct(
             id=orm_model.id,
             name=orm_model.name,
             vector_ids=orm_model.vector_ids if orm_model.vector_ids else [],
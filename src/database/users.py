@@ -1,7 +1,8 @@
-from sqlalchemy import Column, String, Index
+from dataclasses import asdict, dataclass
+from sqlalchemy import Column, String, Index, lambda_stmt, select, update as sa_update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from .engine import Base
 
 
@@ -13,52 +14,65 @@ class UserModel(Base):
     associated_google_email = Column(String, nullable=True)
 
     __table_args__ = (
-        Index("idx_app_name", "app_name"),
         Index("idx_app_team_id", "app_team_id"),
         Index("idx_app_user_id", "app_user_id"),
+        Index("idx_associated_google_email", "associated_google_email"),
     )
 
 
-class User(BaseModel):
+@dataclass(slots=True)
+class User:
     app_team_id: str
     app_user_id: str
     app_name: str
     associated_google_email: Optional[str] = None
 
-    def upsert_user(self, session: Session) -> 'User':
-        user_data = (
-            session.query(UserModel)
-            .filter_by(
-                app_name=self.app_name,
-                app_team_id=self.app_team_id,
-                app_user_id=self.app_user_id,
-            )
-            .first()
-        )
-        if user_data:
-            user_data.associated_google_email = self.associated_google_email
-        else:
-            new_user = UserModel(
-                app_name=self.app_name,
-                app_team_id=self.app_team_id,
-                app_user_id=self.app_user_id,
-                associated_google_email=self.associated_google_email,
-            )
-            session.add(new_user)
-        session.commit()
+    def upsert_user(self, session: Session, commit: bool = True) -> 'User':
+        session.execute(User._upsert_statement([asdict(self)]))
+        if commit:
+            session.commit()
         return self
 
+    @staticmethod
+    def _upsert_statement(rows: List[dict]):
+        stmt = pg_insert(UserModel).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=[
+                UserModel.app_name,
+                UserModel.app_team_id,
+                UserModel.app_user_id,
+            ],
+            set_={"associated_google_email": stmt.excluded.associated_google_email},
+        )
+
     @staticmethod
     def get_user(
         session: Session, app_name: str, app_team_id: str, app_user_id: str
     ) -> Optional["User"]:
-        user_data = (
-            session.query(UserModel)
-            .filter_by(
-                app_name=app_name, app_team_id=app_team_id, app_user_id=app_user_id
+        user_data = session.get(UserModel, (app_name, app_team_id, app_user_id))
+        if user_data:
+            return User(
+                app_name=user_data.app_name,
+                app_team_id=user_data.app_team_id,
+                app_user_id=user_data.app_user_id,
+                associated_google_email=user_data.associated_google_email,
             )
-            .first()
+        return None
+
+    @staticmethod
+    def get_first_user_by_email(session: Session, email: str) -> Optional["User"]:
+        # Served by idx_associated_google_email; lambda_stmt caches the compiled SQL
+        stmt = lambda_stmt(
+            lambda: select(
+                UserModel.app_name,
+                UserModel.app_team_id,
+                UserModel.app_user_id,
+                UserModel.associated_google_email,
+            )
+            .where(UserModel.associated_google_email == email)
+            .limit(1)
         )
+        user_data = session.execute(stmt).first()
         if user_data:
             return User(
                 app_name=user_data.app_name,
@@ -84,14 +98,16 @@ class User(BaseModel):
         app_team_id: str,
         app_user_id: str,
         new_email: str,
+        commit: bool = True,
     ) -> None:
-        user_data = (
-            session.query(UserModel)
-            .filter_by(
-                app_name=app_name, app_team_id=app_team_id, app_user_id=app_user_id
+        session.execute(
+            sa_update(UserModel)
+            .where(
+                UserModel.app_name == app_name,
+                UserModel.app_team_id == app_team_id,
+                UserModel.app_user_id == app_user_id,
             )
-            .first()
+            .values(associated_google_email=new_email)
         )
-        if user_data:
-            user_data.associated_google_email = new_email
+        if commit:
             session.commit()
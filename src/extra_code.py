@@ -1,3 +1,41 @@
+import asyncio
+import binascii
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from cachetools import TTLCache
+import tiktoken
+
+
+@firestore.transactional
+def _advance_history_id(transaction, doc_ref, new_history_id: int) -> int | None:
+    """
+    Store new_history_id if it is newer than the stored one.
+    Returns the previous history ID, or None if this notification is stale.
+    """
+    snapshot = doc_ref.get(transaction=transaction)
+    last_history_id = snapshot.to_dict().get('last_history_id', 0) if snapshot.exists else 0
+    if new_history_id <= last_history_id:
+        return None
+    transaction.set(doc_ref, {'last_history_id': new_history_id}, merge=True)
+    return last_history_id
+
+
+async def _load_notification_context(db, doc_ref, email_address: str, new_history_id: int):
+    """Advance the stored history ID and look up the user in parallel."""
+    return await asyncio.gather(
+        asyncio.to_thread(_advance_history_id, db.transaction(), doc_ref, new_history_id),
+        asyncio.to_thread(_USER_STORE.get_first_user_by_email, email_address),
+    )
+
+
+# Pub/Sub delivers at least once; remember recent message IDs to drop redeliveries
+_SEEN_MESSAGE_IDS: TTLCache = TTLCache(maxsize=1024, ttl=600)
+_SEEN_MESSAGE_IDS_LOCK = threading.Lock()
+
+
 @pubsub_fn.on_message_published(topic="slackbotai-gamil")
 def handle_gmail_notification(event: pubsub_fn.CloudEvent[pubsub_fn.MessagePublishedData]) -> None:
     """
@@ -8,6 +46,15 @@ def handle_gmail_notification(event: pubsub_fn.CloudEvent[pubsub_fn.MessagePubli
         event (pubsub_fn.CloudEvent[pubsub_fn.MessagePublishedData]): The Pub/Sub event.
     """
     try:
+        message_id = event.data.message.message_id
+        # Check and mark under one lock so concurrent deliveries can't both pass
+        with _SEEN_MESSAGE_IDS_LOCK:
+            duplicate = message_id in _SEEN_MESSAGE_IDS
+            _SEEN_MESSAGE_IDS[message_id] = True
+        if duplicate:
+            logger.info(f"Skipping duplicate Pub/Sub delivery {message_id}")
+            return
+
         message_data = event.data.message.data
         decoded_message = base64.b64decode(message_data).decode('utf-8')
         logger.info(f"Received Gmail notification: {decoded_message}")
@@ -17,132 +64,241 @@ def handle_gmail_notification(event: pubsub_fn.CloudEvent[pubsub_fn.MessagePubli
         email_address = notification_data['emailAddress']
         new_history_id = int(notification_data['historyId'])
         
-        # Initialize Firestore client
-        db = firestore.Client()        
-        # Get the last processed history ID from Firestore
+        # Reuse the shared Firestore client
+        db = get_firestore_client()
+        # Advance the stored history ID and look up the user concurrently
         doc_ref = db.collection('gmail_history').document(email_address)
-        doc = doc_ref.get()
-        last_history_id = 0
-        if doc.exists:
-            last_history_id = doc.to_dict().get('last_history_id', 0)
-        
-        # Update the history ID in Firestore
-        doc_ref.set({'last_history_id': new_history_id}, merge=True)
-        bot = SlackBot(os.getenv("SLACK_BOT_TOKEN"))
-        user = FirestoreUserStorage().get_first_user_by_email(email_address)
+        last_history_id, user = asyncio.run(
+            _load_notification_context(db, doc_ref, email_address, new_history_id)
+        )
+        if last_history_id is None:
+            print(f"No new changes for {email_address}")
+            return
+
+        bot = _SLACK_BOT
         if not user:
             print("User not found")
             return
 
-        # Fetch new messages if there's a new history ID
-        if new_history_id > last_history_id:
-            print(f"New history ID detected. Fetching messages for {email_address}")
-            message_string = fetch_and_print_new_messages(email_address, last_history_id, new_history_id)
-            if message_string:
-                response = generate_llm_response(
-                    user_name=bot.get_user_real_name(user_id=user.user_id, team_id=user.team_name),
-                    emails=message_string
-                )
-                if response.send:
-                    print(f"Sending {response.message} .")
-                    bot.send_direct_message(user.user_id, message=response.message, team_id=user.team_name)
-                else:
-                    print("Skipping emails because they aren't important.")
-        else:
-            print(f"No new changes for {email_address}")
+        print(f"New history ID detected. Fetching messages for {email_address}")
+        message_string = fetch_and_print_new_messages(user, last_history_id, new_history_id)
+        if message_string:
+            response = generate_llm_response(
+                user_name=f"<@{user.user_id}>",
+                emails=message_string
+            )
+            if response.send:
+                print(f"Sending {response.message} .")
+                bot.send_direct_message(user.user_id, message=response.message, team_id=user.team_name)
+            else:
+                print("Skipping emails because they aren't important.")
         
     except Exception as e:
         logger.error(f"Error processing Gmail notification: {str(e)}", exc_info=True)
         print(f"Error processing Gmail notification: {str(e)}")
 
 
-def fetch_and_print_new_messages(email_address: str, start_history_id: str, end_history_id: str) -> str:
+# Gmail accepts at most 100 calls per batch request
+GMAIL_BATCH_SIZE = 100
+# Partial response: only the headers and the top-level body parts that are parsed
+GMAIL_MESSAGE_FIELDS = "payload(mimeType,headers,body,parts(mimeType,body))"
+
+# One HTML2Text converter per thread, reused for every HTML email it handles;
+# handle() resets its output between calls but the parser state is not shared
+_H2T_LOCAL = threading.local()
+
+# Below this many HTML emails (each capped at MAX_HTML_BODY_BYTES) converting
+# inline is cheaper than shipping the bodies to the pool
+HTML_POOL_MIN_BATCH = 8
+
+
+def _html_to_markdown(html: str) -> str:
+    converter = getattr(_H2T_LOCAL, "converter", None)
+    if converter is None:
+        converter = _H2T_LOCAL.converter = html2text.HTML2Text()
+        converter.ignore_links = False
+    return converter.handle(html)
+
+
+@lru_cache(maxsize=1)
+def _html_pool() -> ProcessPoolExecutor:
+    """Started on the first large burst and kept for the life of the warm instance.
+
+    Workers are spawned, not forked, since the gRPC Firestore client threads
+    already running here are not fork-safe.
+    """
+    return ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn"))
+
+# Storage and Slack clients are built once per warm instance, not per event
+_TOKEN_MGR = FirebaseOAuthStorage()
+_USER_STORE = FirestoreUserStorage()
+_SLACK_BOT = SlackBot(os.getenv("SLACK_BOT_TOKEN"))
+
+
+# Gmail bodies are base64url; map to the standard alphabet for binascii's decoder
+_URLSAFE_TRANS = str.maketrans("-_", "+/")
+# Only the first this many bytes of an HTML body are decoded and converted
+MAX_HTML_BODY_BYTES = 64 * 1024
+
+
+def _decode_body(body: dict, mime_type: str) -> str:
+    data = body.get('data', '')
+    if mime_type == 'text/html' and body.get('size', 0) > MAX_HTML_BODY_BYTES:
+        # Every 4 base64 characters hold 3 bytes, so decode just enough of them
+        data = data[:-(-MAX_HTML_BODY_BYTES // 3) * 4]
+        return binascii.a2b_base64(data.translate(_URLSAFE_TRANS) + "==")[:MAX_HTML_BODY_BYTES].decode('utf-8', errors='ignore')
+    return binascii.a2b_base64(data.translate(_URLSAFE_TRANS) + "==").decode('utf-8', errors='replace')
+
+
+@lru_cache(maxsize=32)
+def _gmail_service(access_token: str, refresh_token: str):
+    """Build the Gmail service once per credentials pair and reuse it while warm."""
+    creds = Credentials(
+        token=access_token,
+        refresh_token=refresh_token,
+        token_uri="https://oauth2.googleapis.com/token",
+        client_id=os.getenv("GOOGLE_CLIENT_ID"),
+        client_secret=os.getenv("GOOGLE_CLIENT_SECRET")
+    )
+    return build('gmail', 'v1', credentials=creds, static_discovery=True, cache_discovery=False)
+
+
+def fetch_and_print_new_messages(user, start_history_id: str, end_history_id: str) -> str:
+    """user is the already resolved owner of the mailbox, its lookup is not repeated here."""
     try:
         # Get the OAuth tokens
-        token_manager = FirebaseOAuthStorage()
-        user = FirestoreUserStorage().get_first_user_by_email(email_address)
-        if not user:
-            logger.warning("User not found!")
-            return
-
-        tokens = token_manager.get_tokens(user.user_id, user.team_name, "google")
+        tokens = _TOKEN_MGR.get_tokens(user.user_id, user.team_name, "google")
         if not tokens:
             logger.warning("Tokens not found")
             return
 
-        # Create credentials
-        creds = Credentials(
-            token=tokens.access_token,
-            refresh_token=tokens.refresh_token,
-            token_uri="https://oauth2.googleapis.com/token",
-            client_id=os.getenv("GOOGLE_CLIENT_ID"),
-            client_secret=os.getenv("GOOGLE_CLIENT_SECRET")
-        )
-        
-        # Build the Gmail API service
-        service = build('gmail', 'v1', credentials=creds)
+        # Build (or reuse) the Gmail API service for these credentials
+        service = _gmail_service(tokens.access_token, tokens.refresh_token)
         
-        # Fetch the history
-        results = service.users().history().list(
-            userId='me',
-            startHistoryId=start_history_id
-        ).execute()
+        # Fetch only unread message additions from the history, following pages
+        changes = []
+        page_token = None
+        while True:
+            results = service.users().history().list(
+                userId='me',
+                startHistoryId=start_history_id,
+                historyTypes=['messageAdded'],
+                labelId='UNREAD',
+                maxResults=500,
+                pageToken=page_token,
+            ).execute()
+            changes.extend(results.get('history', []))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
         
-        changes = results.get('history', [])
-        
-        new_messages = []
+        # Collect unread messages first so they can be fetched in batches
+        pending = []
+        pending_ids = set()
         for change in changes:
             messages_added = change.get('messagesAdded', [])
             for msg_added in messages_added:
                 msg = msg_added.get('message', {})
-                thread_id = msg.get('threadId', 'Unknown Thread ID')
-                msg_id = msg.get('id', 'Unknown Message ID')
-                label_ids = msg.get('labelIds', [])
-                user_replied = 'SENT' in label_ids
-                if 'UNREAD' not in label_ids:
+                # A message can show up in more than one history record
+                if msg.get('id') in pending_ids:
                     continue
-                # Fetch the complete message
-                full_message = service.users().messages().get(userId='me', id=msg_id).execute()
-                
-                # Extract subject and sender
-                headers = full_message.get('payload', {}).get('headers', [])
-                subject = next((header['value'] for header in headers if header['name'].lower() == 'subject'), 'No Subject')
-                sender = next((header['value'] for header in headers if header['name'].lower() == 'from'), 'Unknown Sender')
-                
-                # Extract message body
-                message_body = ''
-                content_type = 'text/plain'
-                if 'parts' in full_message.get('payload', {}):
-                    for part in full_message['payload']['parts']:
-                        if part.get('mimeType') in ['text/plain', 'text/html']:
-                            message_body = base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
-                            content_type = part.get('mimeType')
-                            break
-                elif 'body' in full_message.get('payload', {}):
-                    message_body = base64.urlsafe_b64decode(full_message['payload']['body']['data']).decode('utf-8')
-                    content_type = full_message['payload'].get('mimeType', 'text/plain')
-                
-                # Convert HTML to markdown if necessary
-                if content_type == 'text/html':
-                    h = html2text.HTML2Text()
-                    h.ignore_links = False
-                    message_body = h.handle(message_body)
-                
-                # Format the email information
-                email_info = f"## Email Details\n\n"
-                email_info += f"**Thread ID:** {thread_id}\n"
-                email_info += f"**Subject:** {subject}\n"
-                email_info += f"**From:** {sender}\n\n"
-                email_info += f"### Message Content\n\n{message_body}\n"
-                if user_replied:
-                    email_info += "\n**Note:** The user has replied in this thread so it might be important.\n"
-                new_messages.append(email_info)
+                pending_ids.add(msg.get('id'))
+                label_ids = msg.get('labelIds', [])
+                pending.append({
+                    'id': msg.get('id', 'Unknown Message ID'),
+                    'thread_id': msg.get('threadId', 'Unknown Thread ID'),
+                    'user_replied': 'SENT' in label_ids,
+                })
+
+        # Fetch the complete messages, up to GMAIL_BATCH_SIZE per HTTP request
+        full_messages = {}
+
+        def on_message_fetched(request_id, response, exception):
+            if exception is not None:
+                logger.error(f"Failed to fetch message {request_id}: {exception}")
+                return
+            full_messages[request_id] = response
+
+        for start in range(0, len(pending), GMAIL_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=on_message_fetched)
+            for item in pending[start:start + GMAIL_BATCH_SIZE]:
+                batch.add(
+                    service.users().messages().get(
+                        userId='me',
+                        id=item['id'],
+                        format='full',
+                        fields=GMAIL_MESSAGE_FIELDS,
+                    ),
+                    request_id=item['id'],
+                )
+            batch.execute()
+
+        emails = []
+        for item in pending:
+            full_message = full_messages.get(item['id'])
+            if full_message is None:
+                continue
+
+            # Extract subject and sender
+            headers = full_message.get('payload', {}).get('headers', [])
+            header_map = {header['name'].lower(): header['value'] for header in headers}
+            
+            # Extract message body
+            message_body = ''
+            content_type = 'text/plain'
+            if 'parts' in full_message.get('payload', {}):
+                # Prefer the plain-text alternative, HTML needs a markdown conversion later
+                parts_by_type = {}
+                for part in full_message['payload']['parts']:
+                    if part.get('body', {}).get('data'):
+                        parts_by_type.setdefault(part.get('mimeType'), part)
+                for mime_type in ('text/plain', 'text/html'):
+                    if mime_type in parts_by_type:
+                        content_type = mime_type
+                        message_body = _decode_body(parts_by_type[mime_type]['body'], content_type)
+                        break
+            elif 'body' in full_message.get('payload', {}):
+                content_type = full_message['payload'].get('mimeType', 'text/plain')
+                message_body = _decode_body(full_message['payload']['body'], content_type)
+
+            emails.append({
+                'thread_id': item['thread_id'],
+                'user_replied': item['user_replied'],
+                'subject': header_map.get('subject', 'No Subject'),
+                'sender': header_map.get('from', 'Unknown Sender'),
+                'body': message_body,
+                'content_type': content_type,
+            })
+
+        # Convert HTML to markdown, off the GIL when the burst is large enough
+        html_emails = [email for email in emails if email['content_type'] == 'text/html']
+        if len(html_emails) >= HTML_POOL_MIN_BATCH:
+            converted = list(_html_pool().map(_html_to_markdown, [email['body'] for email in html_emails], chunksize=4))
+        else:
+            converted = [_html_to_markdown(email['body']) for email in html_emails]
+        for email, markdown in zip(html_emails, converted):
+            email['body'] = markdown
+
+        new_messages = []
+        for email in emails:
+            # Format the email information
+            parts = [
+                "## Email Details\n\n",
+                f"**Thread ID:** {email['thread_id']}\n",
+                f"**Subject:** {email['subject']}\n",
+                f"**From:** {email['sender']}\n\n",
+                f"### Message Content\n\n{email['body']}\n",
+            ]
+            if email['user_replied']:
+                parts.append("\n**Note:** The user has replied in this thread so it might be important.\n")
+            new_messages.append("".join(parts))
 
         # Combine all new messages into one presentable string
         if new_messages:
-            combined_messages = "# New Emails\n\n"
-            for i, message in enumerate(new_messages, 1):
-                combined_messages += f"## Email #{i}\n\n{message}\n\n---\n\n"
+            combined_messages = "".join([
+                "# New Emails\n\n",
+                *(f"## Email #{i}\n\n{message}\n\n---\n\n" for i, message in enumerate(new_messages, 1)),
+            ])
             
             logger.info(combined_messages)
             return combined_messages
@@ -155,7 +311,30 @@ def fetch_and_print_new_messages(email_address: str, start_history_id: str, end_
         return f"Error fetching new messages: {str(e)}"
 
 
+# Upper bound on inbox tokens sent to the summarizer
+MAX_EMAIL_TOKENS = 6000
+
+
+@lru_cache(maxsize=1)
+def _email_encoding():
+    return tiktoken.encoding_for_model("gpt-4o-mini")
+
+
+@lru_cache(maxsize=1)
+def _summary_llm():
+    return ChatOpenAI(model="gpt-4o-mini").with_structured_output(RequestChatMessage)
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    encoding = _email_encoding()
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens]) + "\n\n[Remaining emails truncated]"
+
+
 def generate_llm_response(user_name: str, emails: str) -> RequestChatMessage:
+    emails = _truncate_to_tokens(emails, MAX_EMAIL_TOKENS)
     messages = [
         SystemMessage(
             content="""You are SlackbotAI, a helpful AI assistant. You will look at the new messages from users inbox and ask them if you can help generate a draft and reply them automatically.
@@ -176,5 +355,5 @@ def generate_llm_response(user_name: str, emails: str) -> RequestChatMessage:
             """
         )
     ]
-    return ChatOpenAI(model="gpt-4o-mini").with_structured_output(RequestChatMessage).invoke(messages)
+    return _summary_llm().invoke(messages)
 
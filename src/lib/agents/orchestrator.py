@@ -186,20 +186,20 @@ class Orchestrator:
                 message=message,
             )
             # Update the task status to COMPLETE
-            AgentTask.update(
+            AgentTask.finish(
                 session=self.session,
                 task_id=task_id,
                 status=TaskStatus.COMPLETE,
-                description=f"{AgentTask.read(self.session, task_id).description}\n\nResult:\n{result}",
+                note=f"\n\nResult:\n{result}",
             )
             return result
         except Exception as e:
             # Mark the task as FAILED and log the error message
-            AgentTask.update(
+            AgentTask.finish(
                 session=self.session,
                 task_id=task_id,
                 status=TaskStatus.FAILED,
-                description=f"{AgentTask.read(self.session, task_id).description}\n\nError:\n{e}",
+                note=f"\n\nError:\n{e}",
             )
             return f"Task failed with error: {e}"
 
@@ -3,6 +3,7 @@ import os
 import jwt
 import json
 from authlib.integrations.requests_client import OAuth2Session
+from authlib.integrations.httpx_client import AsyncOAuth2Client
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 from datetime import datetime, timezone
@@ -26,6 +27,7 @@ class OAuthClient:
         self.auth_url = auth_url
         self.token_url = token_url
         self.scope = scope
+        self.requested_scopes = frozenset(scope.split())
         self.secret_key = secret_key[:32]
 
     def get_authorization_url(self, state: dict = None) -> str:
@@ -59,6 +61,24 @@ class OAuthClient:
             self.validate_scopes(token)
         return token
 
+    async def exchange_code_for_token_async(self, code: str, validate: bool = True) -> Dict[str, Any]:
+        """Async variant of exchange_code_for_token so callbacks don't hold a worker thread."""
+        async with AsyncOAuth2Client(
+            client_id=self.client_id,
+            redirect_uri=self.redirect_uri,
+        ) as client:
+            token = await client.fetch_token(
+                self.token_url,
+                code=code,
+                client_secret=self.client_secret,
+                include_client_id=True,
+                auth=None,
+            )
+
+        if validate:
+            self.validate_scopes(token)
+        return dict(token)
+
 
     def refresh_token(self, refresh_token: str) -> Dict[str, Any]:
         client = OAuth2Session(
@@ -113,8 +133,7 @@ class OAuthClient:
     def validate_scopes(self, token_response: Dict[str, Any]) -> None:
         if 'scope' in token_response:
             response_scopes = set(token_response['scope'].split())
-            requested_scopes = set(self.scope.split())
-            if not requested_scopes.issubset(response_scopes):
+            if not self.requested_scopes.issubset(response_scopes):
                 raise ValueError("Requested scopes were not granted")
         else:
             raise ValueError("No scopes were returned in the token response")
@@ -5,6 +5,7 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from typing import List, Dict, Any
 from datetime import datetime
+from functools import lru_cache
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
@@ -12,6 +13,12 @@ from langchain.tools import tool
 from ....database.oauth_tokens import FirebaseOAuthStorage, OAuthTokens, TokenRequest
 
 
+# Gmail accepts at most 100 calls per batch request
+GMAIL_BATCH_SIZE = 100
+# Partial response: drops labelIds, sizeEstimate, historyId and internalDate
+GMAIL_MESSAGE_FIELDS = "threadId,snippet,payload"
+
+
 class GmailHandler:
     def __init__(
         self,
@@ -72,7 +79,7 @@ class GmailHandler:
 
         # Create the Gmail service
         logging.info("Creating Gmail service")
-        self.service = build('gmail', 'v1', credentials=self.credentials)
+        self.service = build('gmail', 'v1', credentials=self.credentials, static_discovery=True, cache_discovery=False)
         logging.info("GmailHandler initialization complete")
 
     def refresh_access_token(self) -> None:
@@ -109,7 +116,7 @@ class GmailHandler:
             List[Dict[str, Any]]: A list of dictionaries containing email information.
         """
         self.refresh_access_token()
-        service = build('gmail', 'v1', credentials=self.credentials)
+        service = self.service
 
         # Initialize for pagination
         email_data = []
@@ -134,9 +141,7 @@ class GmailHandler:
 
             # Stop if the target page is reached
             if current_page == page_number:
-                for message in messages:
-                    msg = service.users().messages().get(userId='me', id=message['id'], format='full').execute()
-
+                for msg in self._batch_get_messages([message['id'] for message in messages]):
                     headers = msg['payload']['headers']
                     email_info = {
                         'sender': '',
@@ -182,6 +187,33 @@ class GmailHandler:
 
         return email_data
 
+    def _batch_get_messages(self, message_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Fetch full messages with one batch HTTP request per GMAIL_BATCH_SIZE ids
+        instead of one request each. Messages that fail to load are skipped,
+        the rest are returned in the order of message_ids.
+        """
+        fetched = {}
+
+        def on_message_fetched(request_id, response, exception):
+            if exception is not None:
+                logging.error(f"Failed to fetch message {request_id}: {exception}")
+                return
+            fetched[request_id] = response
+
+        for start in range(0, len(message_ids), GMAIL_BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=on_message_fetched)
+            for message_id in message_ids[start:start + GMAIL_BATCH_SIZE]:
+                batch.add(
+                    self.service.users().messages().get(
+                        userId='me', id=message_id, format='full', fields=GMAIL_MESSAGE_FIELDS
+                    ),
+                    request_id=message_id,
+                )
+            batch.execute()
+
+        return [fetched[message_id] for message_id in message_ids if message_id in fetched]
+
     def get_signature(self, service, user_email: str) -> str:
         send_as = service.users().settings().sendAs().list(userId=user_email).execute()
         send_as_email = send_as['sendAs'][0]['sendAsEmail']
@@ -191,7 +223,7 @@ class GmailHandler:
     def send_email(
         self, recipient: str, body: str, thread_id: str | None = None, message_id: str | None = None, subject: str = None
     ):
-        service = build('gmail', 'v1', credentials=self.credentials)
+        service = self.service
 
         # Automatically get sender_email
         sender_info = service.users().getProfile(userId='me').execute()
@@ -254,7 +286,7 @@ class GmailHandler:
         Raises:
         ThreadNotFoundException: If the specified thread_id is not found.
         """
-        service = build('gmail', 'v1', credentials=self.credentials)
+        service = self.service
         try:
             thread = service.users().threads().get(userId='me', id=thread_id).execute()
         except Exception as e:
@@ -264,18 +296,18 @@ class GmailHandler:
 
         messages = []
 
-        for msg in thread['messages']:
-            message_data = service.users().messages().get(userId='me', id=msg['id']).execute()
-
+        # threads().get already returns every message in full format
+        for message_data in thread['messages']:
             headers = message_data['payload']['headers']
-            sender = next((header['value'] for header in headers if header['name'].lower() == 'from'), 'Unknown')
-            subject = next((header['value'] for header in headers if header['name'].lower() == 'subject'), 'No Subject')
-            date = next((header['value'] for header in headers if header['name'].lower() == 'date'), 'Unknown')
+            header_map = {header['name'].lower(): header['value'] for header in headers}
+            sender = header_map.get('from', 'Unknown')
+            subject = header_map.get('subject', 'No Subject')
+            date = header_map.get('date', 'Unknown')
 
             body = self._get_message_body(message_data['payload'])
 
             messages.append({
-                'message_id': msg['id'],
+                'message_id': message_data['id'],
                 'sender': sender.split('<')[-1].strip('>') if '<' in sender else sender,
                 'subject': subject,
                 'date': date,
@@ -340,9 +372,7 @@ class GmailHandler:
         return cleaned_content
 
     def send_watch_request(self, topic_name: str):
-        # Create credentials object from tokens
-        # Build the Gmail API service
-        service = build('gmail', 'v1', credentials=self.credentials)
+        service = self.service
 
         # Prepare the watch request body
         watch_request = {
@@ -370,6 +400,17 @@ def create_ai_tools_for_gmail(
     team_id: str
 ) -> List:
 
+    # One handler (and Gmail service) per tool set, built on first use
+    @lru_cache(maxsize=1)
+    def get_handler() -> GmailHandler:
+        return GmailHandler(
+            token_storage=token_storage,
+            client_id=client_id,
+            client_secret=client_secret,
+            user_id=user_id,
+            team_id=team_id
+        )
+
     @tool
     def get_user_gmails(page_number: int = 1, batch_size: int = 10, unread_only: bool = False) -> str:
         """
@@ -393,13 +434,7 @@ def create_ai_tools_for_gmail(
                        is returned as a string.
         """
         try:
-            handler = GmailHandler(
-                token_storage=token_storage,
-                client_id=client_id,
-                client_secret=client_secret,
-                user_id=user_id,
-                team_id=team_id
-            )
+            handler = get_handler()
             return handler.get_inbox_emails(page_number=page_number, batch_size=batch_size, unread_only=unread_only)
         except Exception as e:
             import traceback
@@ -442,13 +477,7 @@ def create_ai_tools_for_gmail(
             if thread_id is None and message_id is None and not sure:
                 raise ValueError("You're trying to send someone a new email. Are you sure you don't want to send a reply? Set sure parameter to 'yes' if you want to continue. Ask the user to confirm if they dont want to send a reply instead, also show them draft.")
 
-            handler = GmailHandler(
-                token_storage=token_storage,
-                client_id=client_id,
-                client_secret=client_secret,
-                user_id=user_id,
-                team_id=team_id
-            )
+            handler = get_handler()
             result = handler.send_email(recipient, body, thread_id, message_id, subject)
             return f"Email sent successfully. Message ID: {result['id']}" if result else "Failed to send email."
         except ValueError as ve:
@@ -475,13 +504,7 @@ def create_ai_tools_for_gmail(
                        is returned as a string.
         """
         try:
-            handler = GmailHandler(
-                token_storage=token_storage,
-                client_id=client_id,
-                client_secret=client_secret,
-                user_id=user_id,
-                team_id=team_id
-            )
+            handler = get_handler()
             return handler.get_thread_messages(thread_id)
         except Exception as e:
             import traceback
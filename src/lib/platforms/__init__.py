@@ -1,8 +1,6 @@
 from enum import Enum
 
-import redis
-
-from ...globals import REDIS_URL
+from ...globals import redis_client
 from .platform_helper import PlatformHelper
 from .slack import SlackHelper
 
@@ -14,7 +12,7 @@ class Platform(Enum):
 def platform_helper_factory(platform: Platform, args: dict) -> PlatformHelper:
     if platform == Platform.SLACK:
         return SlackHelper.from_token(
-            redis=redis.Redis.from_url(REDIS_URL),
+            redis=redis_client,
             init_auth=False,
             **args,
         )
@@ -48,6 +48,11 @@ class PlatformHelper(ABC):
     @abstractmethod
     def team_id(self) -> str: ...
 
+    @property
+    @abstractmethod
+    def platform_args(self) -> dict:
+        """Arguments that rebuild this helper through platform_helper_factory."""
+
     @abstractmethod
     def send_message(self, *args, **kwargs): ...
 
@@ -6,8 +6,16 @@ import json
 from redis import Redis
 import redis
 import requests
+import threading
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from slack_sdk.web import WebClient
 from slack_sdk.errors import SlackApiError
+from slack_sdk.http_retry.builtin_handlers import (
+    ConnectionErrorRetryHandler,
+    RateLimitErrorRetryHandler,
+)
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 from typing import Any, Dict, List, Optional, Tuple, Union
 from typing import Optional
@@ -15,6 +23,25 @@ from .platform_helper import PlatformHelper, FormElement
 from markdown2slack.app import Convert
 
 
+# Shared keep-alive pool for Slack file downloads
+http_session = requests.Session()
+http_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=50,
+        max_retries=Retry(
+            total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]
+        ),
+    ),
+)
+
+# files.info responses, keyed by (bot token, file id). get_file_bytes and
+# get_file_name are usually called back to back for the same file.
+file_info_cache: TTLCache = TTLCache(maxsize=1024, ttl=30)
+file_info_cache_lock = threading.Lock()
+
+
 class SlackHelper(PlatformHelper):
     platform_name = "slack"
 
@@ -54,26 +81,44 @@ class SlackHelper(PlatformHelper):
     def owner_uid(self) -> Optional[str]:
         """
         Retrieves the workspace owner's user ID via the Slack API.
-        It calls users.list and searches for the primary owner.
+        It pages through users.list and stops at the primary owner.
         Returns None if no owner is found or the API call fails.
         """
-        response: dict = self.client.users_list()
-        if response.get("ok"):
+        cursor = ""
+        while True:
+            response: dict = self.client.users_list(limit=200, cursor=cursor or None)
+            if not response.get("ok"):
+                logging.error(f"Failed to retrieve users list: {response.get('error')}")
+                return None
+
             members: List[Dict] = response.get("members", [])
             for member in members:
                 if member.get("is_primary_owner"):
                     owner_id: Optional[str] = member.get("id")
                     logging.info(f"Found primary owner with ID: {owner_id}")
                     return owner_id
-            logging.error("No primary owner found in the users list")
-            return None
-        logging.error(f"Failed to retrieve users list: {response.get('error')}")
+
+            cursor = response.get("response_metadata", {}).get("next_cursor", "")
+            if not cursor:
+                break
+
+        logging.error("No primary owner found in the users list")
         return None
 
     @property
     def user_id(self) -> str:
         return self._user_id
 
+    @property
+    def platform_args(self) -> dict:
+        return {
+            "token": self.client.token,
+            "user_id": self._user_id,
+            "thread_ts": self.thread_ts,
+            "message_ts": self.message_ts,
+            "channel_id": self.channel_id,
+        }
+
     @property
     def team_id(self) -> str:
         if not self._team_id:
@@ -102,6 +147,7 @@ class SlackHelper(PlatformHelper):
                 - message (str): "This is the latest file" for the latest, else an empty string.
         """
         file_info_dict = {}  # To store unique files with the latest timestamp
+        fetched_threads = set()  # Broadcast replies share their parent's thread_ts
         try:
             # Fetch recent messages from the channel
             response = self.client.conversations_history(
@@ -126,8 +172,9 @@ class SlackHelper(PlatformHelper):
                                 "timestamp": timestamp,
                             }
                 # Check if the message starts a thread using `thread_ts`
-                if "thread_ts" in msg:
+                if "thread_ts" in msg and msg["thread_ts"] not in fetched_threads:
                     thread_ts = msg["thread_ts"]
+                    fetched_threads.add(thread_ts)
 
                     # Fetch replies in the thread
                     thread_replies = self.client.conversations_replies(
@@ -186,7 +233,7 @@ class SlackHelper(PlatformHelper):
         # Download the raw file
         download_url = file_info.get("url_private_download") or file_info["url_private"]
         headers = {"Authorization": f"Bearer {self.client.token}"}
-        r = requests.get(download_url, headers=headers)
+        r = http_session.get(download_url, headers=headers)
         if r.status_code != 200:
             raise ValueError(
                 f"Failed to download file content: HTTP {r.status_code}"
@@ -221,13 +268,33 @@ class SlackHelper(PlatformHelper):
         file_info = self._get_file_info(file_id)
         return file_info["name"]
 
+    def prefetch_file_info(self, files: List[dict]):
+        """
+        Seed the file metadata cache with file objects already at hand,
+        e.g. the ones attached to a message event, so the following
+        downloads skip files.info.
+        """
+        with file_info_cache_lock:
+            for file in files:
+                # Stubs that need a files.info lookup carry no download URL
+                if "id" in file and "url_private" in file:
+                    file_info_cache[(self.client.token, file["id"])] = file
+
     def _get_file_info(self, file_id: str) -> dict:
         """
         Helper method to fetch file metadata from Slack using its file ID.
         """
+        cache_key = (self.client.token, file_id)
+        with file_info_cache_lock:
+            file_info = file_info_cache.get(cache_key)
+        if file_info is not None:
+            return file_info
+
         resp = self.client.files_info(file=file_id)
         if not resp["ok"]:
             raise ValueError(f"Failed to fetch file info: {resp['error']}")
+        with file_info_cache_lock:
+            file_info_cache[cache_key] = resp["file"]
         return resp["file"]
 
     def _get_auth_info(self) -> Optional[str]:
@@ -609,7 +676,13 @@ class SlackHelper(PlatformHelper):
         **kwargs,
     ) -> "SlackHelper":
         return SlackHelper(
-            WebClient(token=token),
+            WebClient(
+                token=token,
+                retry_handlers=[
+                    RateLimitErrorRetryHandler(max_retry_count=3),
+                    ConnectionErrorRetryHandler(max_retry_count=2),
+                ],
+            ),
             redis=redis,
             user_id=user_id,
             init_auth=init_auth,
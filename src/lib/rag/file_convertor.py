@@ -1,4 +1,5 @@
 import requests
+from requests.adapters import HTTPAdapter
 from typing import List
 from io import BytesIO
 
@@ -139,6 +140,13 @@ class FileConvertor:
 
     def __init__(self, base_url: str) -> None:
         self.base_url: str = base_url
+        self.session = requests.Session()
+        self.session.mount(
+            "http://", HTTPAdapter(pool_connections=10, pool_maxsize=50)
+        )
+        self.session.mount(
+            "https://", HTTPAdapter(pool_connections=10, pool_maxsize=50)
+        )
 
     def convert_to_pdf(self, input_data: BytesIO, file_extension: str) -> BytesIO:
         if file_extension.lower() not in self.SUPPORTED_EXTENSIONS:
@@ -149,7 +157,7 @@ class FileConvertor:
         try:
             files = {"files": ("file" + file_extension, input_data)}
             endpoint = f"{self.base_url}/forms/libreoffice/convert"
-            response = requests.post(endpoint, files=files)
+            response = self.session.post(endpoint, files=files)
 
             if response.status_code == 200:
                 return BytesIO(response.content)
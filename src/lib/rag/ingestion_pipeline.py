@@ -14,6 +14,28 @@ from langchain_core.documents import Document
 from ...database.data_store import FileStorage, FileUploadData
 
 
+# Supported formats
+SUPPORTED_FILE_TYPES = frozenset({
+    # Office and document formats
+    ".123", ".602", ".abw", ".bib", ".cdr", ".cgm", ".cmx", ".csv", ".cwk", ".dbf",
+    ".dif", ".doc", ".docm", ".docx", ".dot", ".dotm", ".dotx", ".dxf", ".emf", ".eps",
+    ".epub", ".fodg", ".fodp", ".fods", ".fodt", ".fopd", ".htm", ".html", ".hwp",
+    ".key", ".ltx", ".lwp", ".mcw", ".met", ".mml", ".mw", ".numbers", ".odd", ".odg",
+    ".odm", ".odp", ".ods", ".odt", ".otg", ".oth", ".otp", ".ots", ".ott", ".pages",
+    ".pdf", ".pot", ".potm", ".potx", ".pps", ".ppt", ".pptm", ".pptx", ".psw", ".pub",
+    ".rtf", ".sda", ".sdc", ".sdd", ".sdp", ".sdw", ".sgl", ".slk", ".smf", ".stc",
+    ".std", ".sti", ".stw", ".svg", ".svm", ".swf", ".sxc", ".sxd", ".sxg", ".sxi",
+    ".sxm", ".sxw", ".txt", ".uof", ".uop", ".uos", ".uot", ".vdx", ".vor", ".vsd",
+    ".vsdm", ".vsdx", ".wb2", ".wk1", ".wks", ".wpd", ".wps", ".xhtml", ".xls", ".xlsb",
+    ".xlsm", ".xlsx", ".xlt", ".xltm", ".xltx", ".xlw", ".xml", ".zabw",
+    # Image extensions
+    ".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tiff"
+})
+
+TEXT_BASED_FORMATS = frozenset({".json", ".txt", ".csv", ".xml", ".yaml", ".yml", ".log"})
+IMAGE_FILE_TYPES = frozenset({".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tiff"})
+
+
 class IngestionPipeline:
     def __init__(
         self,
@@ -36,37 +58,17 @@ class IngestionPipeline:
         team_id: str,
         platform_name: str
     ) -> list[str]:
-        # Supported formats
-        supported_file_types = {
-            # Office and document formats
-            ".123", ".602", ".abw", ".bib", ".cdr", ".cgm", ".cmx", ".csv", ".cwk", ".dbf",
-            ".dif", ".doc", ".docm", ".docx", ".dot", ".dotm", ".dotx", ".dxf", ".emf", ".eps",
-            ".epub", ".fodg", ".fodp", ".fods", ".fodt", ".fopd", ".htm", ".html", ".hwp",
-            ".key", ".ltx", ".lwp", ".mcw", ".met", ".mml", ".mw", ".numbers", ".odd", ".odg",
-            ".odm", ".odp", ".ods", ".odt", ".otg", ".oth", ".otp", ".ots", ".ott", ".pages",
-            ".pdf", ".pot", ".potm", ".potx", ".pps", ".ppt", ".pptm", ".pptx", ".psw", ".pub",
-            ".rtf", ".sda", ".sdc", ".sdd", ".sdp", ".sdw", ".sgl", ".slk", ".smf", ".stc",
-            ".std", ".sti", ".stw", ".svg", ".svm", ".swf", ".sxc", ".sxd", ".sxg", ".sxi",
-            ".sxm", ".sxw", ".txt", ".uof", ".uop", ".uos", ".uot", ".vdx", ".vor", ".vsd",
-            ".vsdm", ".vsdx", ".wb2", ".wk1", ".wks", ".wpd", ".wps", ".xhtml", ".xls", ".xlsb",
-            ".xlsm", ".xlsx", ".xlt", ".xltm", ".xltx", ".xlw", ".xml", ".zabw",
-            # Image extensions
-            ".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tiff"
-        }
-
-        text_based_formats = {".json", ".txt", ".csv", ".xml", ".yaml", ".yml", ".log"}
-
         # Extract extension
         root, file_extension = os.path.splitext(file_name)
         ext_lower = file_extension.lower()
 
-        if ext_lower not in supported_file_types:
+        if ext_lower not in SUPPORTED_FILE_TYPES:
             raise ValueError(f"Unsupported file type {ext_lower} for file {file_name}")
 
         documents = []
 
         # Handle image files: convert any to JPEG and summarize
-        if ext_lower in {".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tiff"}:
+        if ext_lower in IMAGE_FILE_TYPES:
             # Load image from BytesIO
             img = Image.open(file_bytes_io)
             # Convert to RGB (for formats with alpha)
@@ -111,7 +113,7 @@ class IngestionPipeline:
                     }
                 )
             )
-        elif ext_lower in text_based_formats:
+        elif ext_lower in TEXT_BASED_FORMATS:
             # Text-based read and store
             file_content = file_bytes_io.read().decode("utf-8")
             documents.append(
@@ -125,11 +127,25 @@ class IngestionPipeline:
                 )
             )
         else:
-            # Convert other docs to PDF and extract
-            converted_bytes_io = self.file_convertor.convert_to_pdf(
-                file_bytes_io, ext_lower
-            )
-            extracted_data = self.pdf_extractor.extract_pages(converted_bytes_io)
+            # Convert other docs to PDF and extract; PDFs are read as-is
+            if ext_lower == ".pdf":
+                pdf_bytes_io = file_bytes_io
+            else:
+                pdf_bytes_io = self.file_convertor.convert_to_pdf(
+                    file_bytes_io, ext_lower
+                )
+            extracted_data = self.pdf_extractor.extract_pages(pdf_bytes_io)
+
+            # Store every page's images in one bulk upload instead of two per page
+            uploads = [
+                FileUploadData(
+                    file_name=f"{uuid.uuid4()}_{uuid.uuid4()}.png",
+                    file_bytes=image,
+                )
+                for data in extracted_data
+                for image in (*data.images, *data.page_images)
+            ]
+            image_ids = iter(FileStorage.batch_upload_files(session=self.session, files=uploads))
 
             for data in extracted_data:
                 documents.append(
@@ -137,24 +153,8 @@ class IngestionPipeline:
                         page_content=data.text,
                         metadata={
                             "page_number": data.page_number + 1,
-                            "images": FileStorage.batch_upload_files(
-                                session=self.session,
-                                files=[
-                                    FileUploadData(
-                                        file_name=f"{uuid.uuid4()}_{uuid.uuid4()}.png",
-                                        file_bytes=image,
-                                    ) for image in data.images
-                                ],
-                            ),
-                            "page_images": FileStorage.batch_upload_files(
-                                session=self.session,
-                                files=[
-                                    FileUploadData(
-                                        file_name=f"{uuid.uuid4()}_{uuid.uuid4()}.png",
-                                        file_bytes=image,
-                                    ) for image in data.page_images
-                                ],
-                            ),
+                            "images": [next(image_ids) for _ in data.images],
+                            "page_images": [next(image_ids) for _ in data.page_images],
                             "file_name": file_name,
                             "team_id": team_id,
                             "platform_name": platform_name,
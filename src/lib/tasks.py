@@ -9,6 +9,8 @@ from ..lib.models.llm import LLMConfig
 from ..database.engine import SessionLocal
 from ..lib.agents.orchestrator import Orchestrator
 from ..lib.platforms import platform_helper_factory, Platform
+from ..lib.tools import tools_redis_client
+from ..lib.tools.rag import RAGToolConfig, RAGToolMaker
 
 from celery import Celery
 from langgraph.errors import GraphBubbleUp
@@ -115,3 +117,34 @@ def perform_task(
         logger.info(
             f"Task ended at: {end_time}. Total execution time: {elapsed_time}."
         )
+
+
+@app.task
+def ingest_knowledgebase_file(
+    tool_config: RAGToolConfig,
+    platform: Platform,
+    platform_args: dict,
+    file_id: str,
+):
+    """
+    Download, convert, embed and record a knowledgebase file outside the
+    agent's tool call. The user is sent the updated file list when done.
+    """
+    platform_helper = platform_helper_factory(platform=platform, args=platform_args)
+    session = SessionLocal()
+    try:
+        RAGToolMaker(
+            tool_config=tool_config,
+            platform_helper=platform_helper,
+            oauth_integrations={},
+            session=session,
+            redis_client=tools_redis_client,
+        ).add_file(file_id)
+    except Exception as e:
+        traceback.print_exc()
+        logger.error(f"Failed to ingest file {file_id}: {e}")
+        platform_helper.send_message(
+            message=f"Sorry, I could not add the file to the knowledgebase: {e}"
+        )
+    finally:
+        session.close()
@@ -21,6 +21,11 @@ from .rag import RAGToolConfig, RAGToolMaker
 from langchain.tools import Tool, BaseTool
 
 
+tools_redis_client = redis.Redis.from_url(
+    f"{os.getenv('REDIS_URL')}/3", max_connections=64, health_check_interval=30
+)
+
+
 class ToolName(Enum):
     WEB_SEARCH = "web_search"
     REPORT_GENERATOR = "report_generator"
@@ -98,7 +103,7 @@ def get_all_tools(
             oauth_integrations=oauth_integrations,
             platform_helper=platform_helper,
             session=SessionLocal(),
-            redis_client=redis.Redis.from_url(f"{os.getenv('REDIS_URL')}/3"),
+            redis_client=tools_redis_client,
         )
 
         tools.extend(instance.create_ai_tools())
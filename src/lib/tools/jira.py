@@ -99,14 +99,13 @@ class JiraTools(ToolMaker):
             project_issue_types[project_key].append(issue_type["name"])
 
         # Format the project issue types
-        issue_types_info = ""
-        for project_key, types in project_issue_types.items():
-            project_name = next(
-                (p["name"] for p in projects if p["key"] == project_key), "Unknown"
-            )
-            issue_types_info += f"\n**{project_key}: {project_name}**\n"
-            issue_types_info += "\n".join([f"- {t}" for t in types])
-            issue_types_info += "\n"
+        project_key_to_name = {p["key"]: p["name"] for p in projects}
+        issue_types_info = "".join(
+            f"\n**{project_key}: {project_key_to_name.get(project_key, 'Unknown')}**\n"
+            + "\n".join(f"- {t}" for t in types)
+            + "\n"
+            for project_key, types in project_issue_types.items()
+        )
 
         return (
             f"**Available Jira Projects:**\n{project_info}\n\n"
@@ -203,11 +202,11 @@ class JiraTools(ToolMaker):
         if not result_users:
             return "No matching users found"
 
-        result = "**Matching Jira Users:**\n"
+        lines = ["**Matching Jira Users:**\n"]
         for i, user in enumerate(result_users, 1):
             similarity_percentage = int(user["similarity"] * 100)
-            result += f"{i}. **{user['displayName']}** (Account ID: {user['accountId']}, Match: {similarity_percentage}%)\n"
-        return result
+            lines.append(f"{i}. **{user['displayName']}** (Account ID: {user['accountId']}, Match: {similarity_percentage}%)\n")
+        return "".join(lines)
 
     def create_issue(
         self,
@@ -1,9 +1,11 @@
 import os
+import threading
 import uuid
 import redis
 
 from io import BytesIO
 from typing import List
+from cachetools import TTLCache
 from langchain_core.tools import tool, BaseTool
 from sqlalchemy.orm import Session
 from langchain_postgres import PGVector
@@ -17,9 +19,27 @@ from ..rag.file_convertor import FileConvertor
 from ..rag.pdf_extractor import PDFExtractor
 from ...database.user_files import UserFile
 from ...lib.integrations.auth.oauth_handler import OAuthClient
+from ...lib.platforms import Platform
 from ...lib.platforms.platform_helper import PlatformHelper
 
 
+FILE_EMOJIS = {
+    ".pdf": "📄",
+    **dict.fromkeys((".doc", ".docx"), "📝"),
+    **dict.fromkeys((".xls", ".xlsx", ".csv"), "📊"),
+    **dict.fromkeys((".png", ".jpg", ".jpeg", ".gif", ".bmp"), "🖼️"),
+    **dict.fromkeys((".zip", ".rar", ".7z", ".tar", ".gz"), "🗜️"),
+    **dict.fromkeys((".mp4", ".mov", ".avi", ".mkv"), "🎬"),
+    **dict.fromkeys((".mp3", ".wav", ".aac", ".flac"), "🎵"),
+    **dict.fromkeys((".txt", ".md"), "📃"),
+}
+
+# (team_id, platform_name) -> (watermark, files). Writes from any worker bump
+# the watermark in Redis, so a copy is only served while it is still current.
+team_files_cache: TTLCache = TTLCache(maxsize=1024, ttl=600)
+team_files_cache_lock = threading.Lock()
+
+
 class RAGToolConfig(ToolConfig):
     llm_conf: LLMConfig
 
@@ -39,6 +59,7 @@ It also has functions to be able to access user uploaded files.
         session: Session,
         redis_client: redis.Redis,
     ):
+        self.tool_config = tool_config
         self.session = session
         self.redis_client = redis_client
         self.platform_helper = platform_helper
@@ -58,12 +79,53 @@ It also has functions to be able to access user uploaded files.
             llm=tool_config.llm_conf.to_llm()
         )
 
-    def get_team_docs(self):
+    def add_file(self, file_id: str) -> UserFile:
+        file_bytes = self.platform_helper.get_file_bytes(file_id)
+        file_name = self.platform_helper.get_file_name(file_id)
+        vector_ids = self.ingestion_pipeline.ingest_file(
+            BytesIO(file_bytes),
+            file_name,
+            self.platform_helper.team_id,
+            self.platform_helper.platform_name,
+        )
+        user_file = UserFile(
+            id=uuid.uuid4(),
+            name=file_name,
+            vector_ids=vector_ids,
+            team_id=self.platform_helper.team_id,
+            platform_name=self.platform_helper.platform_name,
+        ).create(self.session)
+        self.bump_team_files_watermark()
+        self.get_team_docs()
+        return user_file
+
+    def team_files_watermark_key(self) -> str:
+        return f"user_files_watermark:{self.platform_helper.platform_name}:{self.platform_helper.team_id}"
+
+    def bump_team_files_watermark(self):
+        self.redis_client.incr(self.team_files_watermark_key())
+
+    def list_team_files(self) -> List[UserFile]:
+        """The team's knowledgebase files, served from memory until a write bumps the watermark."""
+        cache_key = (self.platform_helper.team_id, self.platform_helper.platform_name)
+        # Read the watermark before querying, a write racing the query then misses next time
+        watermark = self.redis_client.get(self.team_files_watermark_key())
+        with team_files_cache_lock:
+            cached = team_files_cache.get(cache_key)
+        if cached is not None and cached[0] == watermark:
+            return cached[1]
+
         team_files = UserFile.get_files_by_team_and_platform(
             self.platform_helper.team_id,
             self.platform_helper.platform_name,
             self.session,
         )
+        with team_files_cache_lock:
+            team_files_cache[cache_key] = (watermark, team_files)
+        return team_files
+
+    def get_team_docs(self):
+        team_files = self.list_team_files()
         message = self.generate_file_list_message(team_files)
         if message:
             self.platform_helper.send_message(message)
@@ -92,27 +154,8 @@ It also has functions to be able to access user uploaded files.
         return "\n".join(lines)
 
     def get_emoji_for_file(self, filename: str) -> str:
-        filename = filename.lower()
-
-        if filename.endswith(".pdf"):
-            return "📄"
-        elif filename.endswith((".doc", ".docx")):
-            return "📝"
-        elif filename.endswith((".xls", ".xlsx", ".csv")):
-            return "📊"
-        elif filename.endswith((".png", ".jpg", ".jpeg", ".gif", ".bmp")):
-            return "🖼️"
-        elif filename.endswith((".zip", ".rar", ".7z", ".tar", ".gz")):
-            return "🗜️"
-        elif filename.endswith((".mp4", ".mov", ".avi", ".mkv")):
-            return "🎬"
-        elif filename.endswith((".mp3", ".wav", ".aac", ".flac")):
-            return "🎵"
-        elif filename.endswith((".txt", ".md")):
-            return "📃"
-        else:
-            return "📄"  # default for unknown files
-
+        extension = os.path.splitext(filename)[1].lower()
+        return FILE_EMOJIS.get(extension, "📄")  # default for unknown files
 
     def create_ai_tools(self) -> list[BaseTool]:
         @tool
@@ -150,38 +193,34 @@ It also has functions to be able to access user uploaded files.
         @tool
         def add_file_to_knowledgebase(file_id: str):
             """Add a file to the knowledgebase."""
-            file_bytes = self.platform_helper.get_file_bytes(file_id)
-            file_name = self.platform_helper.get_file_name(file_id)
-            vector_ids = self.ingestion_pipeline.ingest_file(
-                BytesIO(file_bytes),
-                file_name,
-                self.platform_helper.team_id,
-                self.platform_helper.platform_name,
+            # Imported here, the tasks module imports the tool registry
+            from ..tasks import ingest_knowledgebase_file
+
+            ingest_knowledgebase_file.apply_async(  # type: ignore
+                kwargs=dict(
+                    tool_config=self.tool_config,
+                    platform=Platform(self.platform_helper.platform_name.upper()),
+                    platform_args=self.platform_helper.platform_args,
+                    file_id=file_id,
+                )
             )
-            UserFile(
-                id=uuid.uuid4(),
-                name=file_name,
-                vector_ids=vector_ids,
-                team_id=self.platform_helper.team_id,
-                platform_name=self.platform_helper.platform_name,
-            ).create(self.session)
-            self.get_team_docs()
-            return "File ingested into knowledgebase successfully. Now you can search for it using the search_team_docs tool and answer questions"
+            return "File is being ingested into the knowledgebase. The user will get a message with the updated file list once it is ready, after that you can search it using the search_team_docs tool"
 
         @tool
         def delete_file_from_knowledgebase(filename: str):
             "Used to delete file from the knowledgebase"
-            user_file = UserFile.read(
+            vector_ids = UserFile.delete_by_name(
                 filename,
                 self.platform_helper.team_id,
                 self.platform_helper.platform_name,
                 self.session
             )
-            if not user_file or not user_file.id:
+            if vector_ids is None:
                 return f"File with name '{filename}' not found.."
-            
-            UserFile.delete(user_file.id, self.session)
-            self.ingestion_pipeline.delete_ids(user_file.vector_ids)
+
+            self.bump_team_files_watermark()
+            if vector_ids:
+                self.ingestion_pipeline.delete_ids(vector_ids)
             self.get_team_docs()
             return f"File deleted successfully. the user they can see the remaining files in chat an automated message was sent"
         
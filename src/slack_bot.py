@@ -6,7 +6,10 @@ import time
 import uuid
 import psycopg
 import redis
+import threading
 
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
 from langchain_postgres import PostgresChatMessageHistory
 from slack_bolt.adapter.socket_mode import SocketModeHandler
 from slack_sdk.errors import SlackApiError
@@ -21,12 +24,15 @@ from .lib.tools import ToolName
 from .lib.platforms.slack import SlackHelper
 from .lib.platforms import Platform
 from .lib.tasks import AgentConfig, perform_task
-from .globals import app, REDIS_URL
+from .globals import app, redis_client as helper_redis_client
 
 
 redis_client = redis.Redis.from_url(
     os.getenv("REDIS_URL", "redis://localhost:6379"), decode_responses=True
 )
+# (team_id, user_id) -> (user_name, email); spares Redis/users.info on repeat senders
+user_profile_cache: TTLCache = TTLCache(maxsize=10000, ttl=600)
+user_profile_cache_lock = threading.Lock()
 
 
 @app.event("message")
@@ -72,15 +78,18 @@ def handle_message_events(body, say):
             "channel_id": channel_id,
         }
         helper = SlackHelper.from_token(
-            token=token, user_id=user_id, redis=redis.Redis.from_url(REDIS_URL)
+            token=token, user_id=user_id, redis=helper_redis_client
         )
 
-        # 1) Try cache lookup for user name
+        # 1) Try cache lookup for user name, in-process first then Redis
         cache_key_name = f"user_name:{user_id}"
         cache_key_email = f"user_email:{user_id}"
 
-        user_name = redis_client.get(cache_key_name)
-        email = redis_client.get(cache_key_email)
+        with user_profile_cache_lock:
+            user_name, email = user_profile_cache.get((team_id, user_id), (None, None))
+        if not user_name or not email:
+            user_name = redis_client.get(cache_key_name)
+            email = redis_client.get(cache_key_email)
 
         # 2) If missing, fetch from Slack API and cache
         if (not user_name or not email) and user_id:
@@ -103,6 +112,10 @@ def handle_message_events(body, say):
                 user_name = user_id
                 email = None
 
+        if user_name and email:
+            with user_profile_cache_lock:
+                user_profile_cache[(team_id, user_id)] = (user_name, email)
+
         # 3) Prepend the user’s name to the message text
         email_message = f"({email})" if email else ""
         text = f"{user_name} {email_message}: {text}"
@@ -200,10 +213,16 @@ def handle_message_events(body, say):
                     ),
                 }
 
-                uploaded_images: list[bytes] = []
-                for file in files:
-                    if re.search(r'\.(jpg|jpeg|png|webp)$', file["name"], re.IGNORECASE):
-                        uploaded_images.append(helper.get_file_bytes(file["id"]))
+                helper.prefetch_file_info(files)
+                image_ids = [
+                    file["id"]
+                    for file in files
+                    if re.search(r'\.(jpg|jpeg|png|webp)$', file["name"], re.IGNORECASE)
+                ]
+                with ThreadPoolExecutor(max_workers=4) as executor:
+                    uploaded_images: list[bytes] = list(
+                        executor.map(helper.get_file_bytes, image_ids)
+                    )
               
                 perform_task.apply_async(  # type: ignore
                     kwargs=dict(
@@ -267,7 +286,7 @@ def handle_form_submission(ack, body, logger):
     # Use bot_access_token for sending messages
     token = token_obj.bot_access_token
     helper = SlackHelper.from_token(
-        token=token, user_id=user_id, redis=redis.Redis.from_url(REDIS_URL)
+        token=token, user_id=user_id, redis=helper_redis_client
     )
 
     # Extract the form values from the state object